@@ -1,3 +1,4 @@
+import copy
 import os
 import typing
 from typing import Optional, Text, List
@@ -13,7 +14,12 @@ def load(config_file: Optional[Text]) -> List["Policy"]:
     from rasa.core.policies.ensemble import PolicyEnsemble
 
     if config_file and os.path.isfile(config_file):
-        config_data = rasa.utils.io.read_config_file(config_file)
+        # the cached content is shared, hence it has to be copied
+        config_data = copy.deepcopy(
+            rasa.utils.io.read_file_with_cache(
+                config_file, rasa.utils.io.read_config_file
+            )
+        )
     else:
         raise ValueError(
             "You have to provide a valid path to a config file. "
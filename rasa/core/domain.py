@@ -1,4 +1,5 @@
 import collections
+import copy
 import json
 import logging
 import os
@@ -96,17 +97,27 @@ class Domain(object):
 
     @classmethod
     def from_file(cls, path: Text) -> "Domain":
-        return cls.from_yaml(rasa.utils.io.read_file(path))
+        # validating and parsing the file is expensive, hence it is only done
+        # again if the file changed
+        data = rasa.utils.io.read_file_with_cache(path, cls._read_file)
+        return cls.from_dict(copy.deepcopy(data))
 
     @classmethod
     def from_yaml(cls, yaml: Text) -> "Domain":
+        return cls.from_dict(cls._validate_and_read_yaml(yaml))
+
+    @classmethod
+    def _read_file(cls, path: Text) -> Dict:
+        return cls._validate_and_read_yaml(rasa.utils.io.read_file(path))
+
+    @staticmethod
+    def _validate_and_read_yaml(yaml: Text) -> Dict:
         try:
             validate_yaml_schema(yaml, DOMAIN_SCHEMA_FILE)
         except InvalidYamlFileError as e:
             raise InvalidDomain(str(e))
 
-        data = rasa.utils.io.read_yaml(yaml)
-        return cls.from_dict(data)
+        return rasa.utils.io.read_yaml(yaml)
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Domain":
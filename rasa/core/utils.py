@@ -1,34 +1,62 @@
 # -*- coding: utf-8 -*-
 import argparse
 import asyncio
+import functools
+import hashlib
 import json
 import logging
+import os
+import random
 import re
 import sys
+import tempfile
+import uuid
 from pathlib import Path
 from typing import Union
 from asyncio import Future
-from hashlib import md5, sha1
-from io import StringIO
-from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING, Text, Tuple, Callable
+from collections import deque
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Set, Text, Tuple, Callable
+from urllib.parse import unquote
 
 import aiohttp
+import numpy as np
+import ruamel.yaml as yaml
 from aiohttp import InvalidURL
 from sanic import Sanic
 from sanic.views import CompositionView
 
-import rasa.utils.io as io_utils
-from rasa.utils.endpoints import read_endpoint_config
+from rasa.utils.endpoints import read_endpoint_configs
 
 
 # backwards compatibility 1.0.x
 # noinspection PyUnresolvedReferences
 from rasa.utils.endpoints import concat_url
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # only available from xxhash 2.0 onwards
+    from xxhash import xxh3_64_intdigest
+except ImportError:
+    xxh3_64_intdigest = None
+
 logger = logging.getLogger(__name__)
 
-if TYPE_CHECKING:
-    from random import Random
+# blake2b is only guaranteed to be available from python 3.6 onwards
+if "blake2b" in hashlib.algorithms_guaranteed:
+    _HASHER = functools.partial(hashlib.blake2b, digest_size=16)
+else:
+    _HASHER = hashlib.md5
+
+# size of the chunks in which files are read when calculating their hash
+FILE_HASH_CHUNK_SIZE = 1024 * 1024
+
+# size of the chunks in which downloaded files are written to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 
 def configure_file_logging(log_file: Optional[Text]):
@@ -44,10 +72,38 @@ def module_path_from_instance(inst: Any) -> Text:
     return inst.__module__ + "." + inst.__class__.__name__
 
 
+def _orjson_dumps(obj: Any) -> Optional[bytes]:
+    """Serialize an object to indented utf-8 encoded json using `orjson`.
+
+    Returns `None` if `orjson` is not installed, can't serialize the object or
+    might have written a non finite float (which `orjson` writes as `null`)."""
+
+    if orjson is None:
+        return None
+
+    try:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        # e.g. numpy values or non string keys
+        return None
+
+    if b"null" in data:
+        # `json` keeps `NaN` and `Infinity`
+        return None
+    return data
+
+
 def dump_obj_as_json_to_file(filename: Text, obj: Any) -> None:
     """Dump an object as a json string to a file."""
 
-    dump_obj_as_str_to_file(filename, json.dumps(obj, indent=2))
+    data = _orjson_dumps(obj)
+    if data is not None:
+        with open(filename, "wb") as f:
+            f.write(data)
+    else:
+        # stream the json to the file instead of building the whole string first
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
 
 
 def dump_obj_as_str_to_file(filename: Text, text: Text) -> None:
@@ -62,18 +118,17 @@ def subsample_array(
     arr: List[Any],
     max_values: int,
     can_modify_incoming_array: bool = True,
-    rand: Optional["Random"] = None,
+    rand: Optional[random.Random] = None,
 ) -> List[Any]:
-    """Shuffles the array and returns `max_values` number of elements."""
-    import random
+    """Returns a random sample of `max_values` elements of the array.
 
-    if not can_modify_incoming_array:
-        arr = arr[:]
-    if rand is not None:
-        rand.shuffle(arr)
-    else:
-        random.shuffle(arr)
-    return arr[:max_values]
+    If the array doesn't contain more than `max_values` elements, all of them
+    are returned in their original order. The incoming array is never modified,
+    `can_modify_incoming_array` is only kept for backwards compatibility."""
+    if max_values >= len(arr):
+        return list(arr)
+
+    return (rand or random).sample(arr, max_values)
 
 
 def is_int(value: Any) -> bool:
@@ -81,6 +136,12 @@ def is_int(value: Any) -> bool:
 
     The type of the value is not important, it might be an int or a float."""
 
+    if isinstance(value, int):
+        return True
+    elif isinstance(value, float):
+        # `False` for `inf` and `nan` instead of raising
+        return value.is_integer()
+
     # noinspection PyBroadException
     try:
         return value == int(value)
@@ -88,33 +149,36 @@ def is_int(value: Any) -> bool:
         return False
 
 
-def lazyproperty(fn):
+# noinspection PyPep8Naming
+class lazyproperty(object):
     """Allows to avoid recomputing a property over and over.
 
-    Instead the result gets stored in a local var. Computation of the property
-    will happen once, on the first call of the property. All succeeding calls
-    will use the value stored in the private property."""
+    Computation of the property will happen once, on the first call of the
+    property. The result gets stored in the instance under the name of the
+    property, so all succeeding calls read the value directly without calling
+    this descriptor again."""
 
-    attr_name = "_lazy_" + fn.__name__
+    def __init__(self, fn):
+        self.fn = fn
+        self.name = fn.__name__
+        self.__doc__ = fn.__doc__
 
-    @property
-    def _lazyprop(self):
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
 
-    return _lazyprop
+        value = self.fn(instance)
+        instance.__dict__[self.name] = value
+        return value
 
 
 def one_hot(hot_idx, length, dtype=None):
-    import numpy
-
     if hot_idx >= length:
         raise ValueError(
             "Can't create one hot. Index '{}' is out "
             "of range (length '{}')".format(hot_idx, length)
         )
-    r = numpy.zeros(length, dtype)
+    r = np.zeros(length, dtype)
     r[hot_idx] = 1
     return r
 
@@ -124,8 +188,6 @@ def str_range_list(start, end):
 
 
 def generate_id(prefix="", max_chars=None):
-    import uuid
-
     gid = uuid.uuid4().hex
     if max_chars:
         gid = gid[:max_chars]
@@ -134,22 +196,25 @@ def generate_id(prefix="", max_chars=None):
 
 
 def request_input(valid_values=None, prompt=None, max_suggested=3):
-    def wrong_input_message():
-        print (
-            "Invalid answer, only {}{} allowed\n".format(
-                ", ".join(valid_values[:max_suggested]),
-                ",..." if len(valid_values) > max_suggested else "",
-            )
+    if valid_values is not None:
+        valid_values = list(valid_values)
+        allowed_values = frozenset(valid_values)
+        wrong_input_message = "Invalid answer, only {}{} allowed\n".format(
+            ", ".join(valid_values[:max_suggested]),
+            ",..." if len(valid_values) > max_suggested else "",
         )
+    else:
+        allowed_values = None
+        wrong_input_message = "Invalid answer\n"
 
     while True:
         try:
             input_value = input(prompt) if prompt else input()
-            if valid_values is not None and input_value not in valid_values:
-                wrong_input_message()
+            if allowed_values is not None and input_value not in allowed_values:
+                print (wrong_input_message)
                 continue
         except ValueError:
-            wrong_input_message()
+            print (wrong_input_message)
             continue
         return input_value
 
@@ -181,16 +246,28 @@ class HashableNDArray(object):
             Optional. If True, a copy of the input ndaray is created.
             Defaults to False.
         """
-        from numpy import array
-
         self.__tight = tight
-        self.__wrapped = array(wrapped) if tight else wrapped
-        self.__hash = int(sha1(wrapped.view()).hexdigest(), 16)
+        self.__wrapped = np.array(wrapped) if tight else wrapped
+        self.__hash = self._hash_array(self.__wrapped)
 
-    def __eq__(self, other):
-        from numpy import all
+    @staticmethod
+    def _hash_array(arr) -> int:
+        """Calculates a (non cryptographic) hash of the arrays content.
 
-        return all(self.__wrapped == other.__wrapped)
+        Uses `xxhash` (>= 2.0) if it is installed, otherwise falls back to the
+        builtin `hash` of the arrays bytes."""
+
+        if xxh3_64_intdigest is None:
+            return hash(arr.tobytes())
+
+        if arr.flags.c_contiguous:
+            data = memoryview(arr).cast("B")
+        else:
+            data = arr.tobytes()
+        return xxh3_64_intdigest(data)
+
+    def __eq__(self, other):
+        return np.all(self.__wrapped == other.__wrapped)
 
     def __hash__(self):
         return self.__hash
@@ -200,18 +277,18 @@ class HashableNDArray(object):
 
         If the wrapper is "tight", a copy of the encapsulated ndarray is
         returned. Otherwise, the encapsulated ndarray itself is returned."""
-        from numpy import array
-
         if self.__tight:
-            return array(self.__wrapped)
+            return np.array(self.__wrapped)
 
         return self.__wrapped
 
 
 def _dump_yaml(obj, output):
-    import ruamel.yaml
+    """Dumps an object as yaml to the output stream.
+
+    If `output` is a binary stream, the yaml gets written encoded as utf-8."""
 
-    yaml_writer = ruamel.yaml.YAML(pure=True, typ="safe")
+    yaml_writer = yaml.YAML(pure=True, typ="safe")
     yaml_writer.unicode_supplementary = True
     yaml_writer.default_flow_style = False
     yaml_writer.version = "1.1"
@@ -221,30 +298,27 @@ def _dump_yaml(obj, output):
 
 def dump_obj_as_yaml_to_file(filename: Union[Text, Path], obj: Dict) -> None:
     """Writes data (python dict) to the filename in yaml repr."""
-    with open(str(filename), "w", encoding="utf-8") as output:
+    with open(str(filename), "wb") as output:
         _dump_yaml(obj, output)
 
 
 def dump_obj_as_yaml_to_string(obj: Dict) -> Text:
     """Writes data (python dict) to a yaml string."""
-    str_io = StringIO()
-    _dump_yaml(obj, str_io)
-    return str_io.getvalue()
+    bytes_io = BytesIO()
+    _dump_yaml(obj, bytes_io)
+    return bytes_io.getvalue().decode("utf-8")
 
 
 def list_routes(app: Sanic):
     """List all the routes of a sanic application.
 
     Mainly used for debugging."""
-    from urllib.parse import unquote
-
     output = {}
 
-    def find_route(suffix, path):
-        for name, (uri, _) in app.router.routes_names.items():
-            if name.split(".")[-1] == suffix and uri == path:
-                return name
-        return None
+    # maps (handler name, uri) to the full route name
+    route_names = {}
+    for name, (uri, _) in app.router.routes_names.items():
+        route_names.setdefault((name.rpartition(".")[2], uri), name)
 
     for endpoint, route in app.router.routes_all.items():
         if endpoint[:-1] in app.router.routes_all and endpoint[-1] == "/":
@@ -258,7 +332,7 @@ def list_routes(app: Sanic):
             handlers = [(list(route.methods)[0], route.name)]
         else:
             handlers = [
-                (method, find_route(v.__name__, endpoint) or v.__name__)
+                (method, route_names.get((v.__name__, endpoint)) or v.__name__)
                 for method, v in route.handler.handlers.items()
             ]
 
@@ -277,13 +351,12 @@ def cap_length(s, char_limit=20, append_ellipsis=True):
 
     Appends an ellipsis if the string is to long."""
 
-    if len(s) > char_limit:
-        if append_ellipsis:
-            return s[: char_limit - 3] + "..."
-        else:
-            return s[:char_limit]
-    else:
+    if len(s) <= char_limit:
         return s
+    elif append_ellipsis:
+        return s[: char_limit - 3] + "..."
+    else:
+        return s[:char_limit]
 
 
 def extract_args(
@@ -293,23 +366,32 @@ def extract_args(
 
     Return both, the filtered kwargs as well as the remaining kwargs."""
 
-    remaining = {}
-    extracted = {}
-    for k, v in kwargs.items():
-        if k in keys_to_extract:
-            extracted[k] = v
-        else:
-            remaining[k] = v
+    if not isinstance(keys_to_extract, (set, frozenset)):
+        keys_to_extract = frozenset(keys_to_extract)
+
+    extracted = {k: kwargs[k] for k in keys_to_extract if k in kwargs}
+    remaining = {k: v for k, v in kwargs.items() if k not in keys_to_extract}
 
     return extracted, remaining
 
 
 def all_subclasses(cls: Any) -> List[Any]:
-    """Returns all known (imported) subclasses of a class."""
+    """Returns all known (imported) subclasses of a class.
 
-    return cls.__subclasses__() + [
-        g for s in cls.__subclasses__() for g in all_subclasses(s)
-    ]
+    Closer subclasses are returned first, every class is only returned once even
+    if it inherits from the class on multiple paths."""
+
+    subclasses = []
+    seen = set()
+    queue = deque([cls])
+    while queue:
+        for subclass in queue.popleft().__subclasses__():
+            if subclass not in seen:
+                seen.add(subclass)
+                subclasses.append(subclass)
+                queue.append(subclass)
+
+    return subclasses
 
 
 def is_limit_reached(num_messages, limit):
@@ -319,39 +401,80 @@ def is_limit_reached(num_messages, limit):
 def read_lines(filename, max_line_limit=None, line_pattern=".*"):
     """Read messages from the command line and print bot responses."""
 
-    line_filter = re.compile(line_pattern)
+    # the default pattern matches every line up to the line break,
+    # no need to run a regex over the lines for it
+    line_filter = None if line_pattern == ".*" else re.compile(line_pattern)
 
     with open(filename, "r", encoding="utf-8") as f:
         num_messages = 0
         for line in f:
-            m = line_filter.match(line)
-            if m is not None:
-                yield m.group(1 if m.lastindex else 0)
+            if line_filter is None:
+                yield line.rstrip("\n")
                 num_messages += 1
+            else:
+                m = line_filter.match(line)
+                if m is not None:
+                    yield m.group(1 if m.lastindex else 0)
+                    num_messages += 1
 
             if is_limit_reached(num_messages, max_line_limit):
                 break
 
 
+def _advise_sequential_read(f) -> None:
+    """Tells the OS that the file is going to be read sequentially.
+
+    Allows the kernel to read ahead more aggressively. Does nothing on
+    platforms without `posix_fadvise`."""
+
+    try:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except (AttributeError, OSError):
+        pass
+
+
 def file_as_bytes(path: Text) -> bytes:
     """Read in a file as a byte array."""
     with open(path, "rb") as f:
+        _advise_sequential_read(f)
         return f.read()
 
 
 def get_file_hash(path: Text) -> Text:
-    """Calculate the md5 hash of a file."""
-    return md5(file_as_bytes(path)).hexdigest()
+    """Calculate the hash of a file.
+
+    The file is read in chunks, so it never has to be held in memory as a whole."""
+
+    file_hash = _HASHER()
+    buffer = bytearray(FILE_HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        _advise_sequential_read(f)
+        for num_bytes in iter(lambda: f.readinto(buffer), 0):
+            file_hash.update(view[:num_bytes])
+    return file_hash.hexdigest()
 
 
 def get_text_hash(text: Text, encoding: Text = "utf-8") -> Text:
-    """Calculate the md5 hash for a text."""
-    return md5(text.encode(encoding)).hexdigest()
+    """Calculate the hash for a text."""
+    return _HASHER(text.encode(encoding)).hexdigest()
 
 
 def get_dict_hash(data: Dict, encoding: Text = "utf-8") -> Text:
-    """Calculate the md5 hash of a dictionary."""
-    return md5(json.dumps(data, sort_keys=True).encode(encoding)).hexdigest()
+    """Calculate the hash of a dictionary.
+
+    The hash is stable across processes and machines, so it can be persisted
+    (e.g. as part of a model fingerprint)."""
+    return _HASHER(_canonical_json(data).encode(encoding)).hexdigest()
+
+
+def _canonical_json(data: Any) -> Text:
+    """Serializes json data the same way on every machine.
+
+    Always uses the standard library (and never `orjson`), which writes floats
+    as their shortest `repr` and non finite floats as `NaN` and `Infinity`."""
+
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
 
 async def download_file_from_url(url: Text) -> Text:
@@ -366,9 +489,18 @@ async def download_file_from_url(url: Text) -> Text:
 
     async with aiohttp.ClientSession() as session:
         async with session.get(url, raise_for_status=True) as resp:
-            filename = io_utils.create_temporary_file(await resp.read(), mode="w+b")
+            # stream the content to disk instead of loading all of it into memory
+            with tempfile.NamedTemporaryFile(mode="w+b", delete=False) as f:
+                try:
+                    async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                except BaseException:
+                    # don't leave partially downloaded files behind
+                    f.close()
+                    os.remove(f.name)
+                    raise
 
-    return filename
+    return f.name
 
 
 def remove_none_values(obj: Dict[Text, Any]) -> Dict[Text, Any]:
@@ -386,16 +518,26 @@ class AvailableEndpoints(object):
 
     @classmethod
     def read_endpoints(cls, endpoint_file):
-        nlg = read_endpoint_config(endpoint_file, endpoint_type="nlg")
-        nlu = read_endpoint_config(endpoint_file, endpoint_type="nlu")
-        action = read_endpoint_config(endpoint_file, endpoint_type="action_endpoint")
-        model = read_endpoint_config(endpoint_file, endpoint_type="models")
-        tracker_store = read_endpoint_config(
-            endpoint_file, endpoint_type="tracker_store"
+        configs = read_endpoint_configs(
+            endpoint_file,
+            [
+                "nlg",
+                "nlu",
+                "action_endpoint",
+                "models",
+                "tracker_store",
+                "event_broker",
+            ],
         )
-        event_broker = read_endpoint_config(endpoint_file, endpoint_type="event_broker")
 
-        return cls(nlg, nlu, action, model, tracker_store, event_broker)
+        return cls(
+            configs["nlg"],
+            configs["nlu"],
+            configs["action_endpoint"],
+            configs["models"],
+            configs["tracker_store"],
+            configs["event_broker"],
+        )
 
     def __init__(
         self,
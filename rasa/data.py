@@ -66,12 +66,50 @@ def get_core_nlu_directories(
         containing the NLU training files.
     """
 
+    story_directory, nlu_directory, _, _ = get_core_nlu_directories_with_data_flags(
+        paths, skill_imports
+    )
+
+    return story_directory, nlu_directory
+
+
+def get_core_nlu_directories_with_data_flags(
+    paths: Optional[Union[Text, List[Text]]],
+    skill_imports: Optional["SkillSelector"] = None,
+    directory: Optional[Text] = None,
+) -> Tuple[Text, Text, bool, bool]:
+    """Recursively collects all training files from a list of paths.
+
+    In contrast to `get_core_nlu_directories` this also returns whether any
+    training files were found, so that the directories don't have to be
+    listed again to find out.
+
+    Args:
+        paths: List of paths to training files or folders containing them.
+        skill_imports: `SkillSelector` instance which determines which files
+                        should be loaded.
+        directory: Existing directory in which the `stories` and `nlu`
+                   directories for the files are created. If `None` new
+                   temporary directories are used.
+
+    Returns:
+        Path to directory containing the Core files, path to directory
+        containing the NLU training files, whether there are any Core files
+        and whether there are any NLU training files.
+    """
+
     story_files, nlu_data_files = get_core_nlu_files(paths, skill_imports)
 
-    story_directory = _copy_files_to_new_dir(story_files)
-    nlu_directory = _copy_files_to_new_dir(nlu_data_files)
+    if directory is None:
+        story_directory = nlu_directory = None
+    else:
+        story_directory = os.path.join(directory, "stories")
+        nlu_directory = os.path.join(directory, "nlu")
 
-    return story_directory, nlu_directory
+    story_directory = _copy_files_to_new_dir(story_files, story_directory)
+    nlu_directory = _copy_files_to_new_dir(nlu_data_files, nlu_directory)
+
+    return story_directory, nlu_directory, bool(story_files), bool(nlu_data_files)
 
 
 def get_core_nlu_files(
@@ -148,10 +186,10 @@ def _find_core_nlu_files_in_directory(
 
 
 def _is_valid_filetype(path: Text) -> bool:
-    is_file = os.path.isfile(path)
     is_datafile = path.endswith(".json") or path.endswith(".md")
 
-    return is_file and is_datafile
+    # only check the file system for files which might be training files
+    return is_datafile and os.path.isfile(path)
 
 
 def _is_nlu_file(file_path: Text) -> bool:
@@ -191,12 +229,26 @@ def is_config_file(file_path: Text) -> bool:
     return file_name in ["config.yml", "config.yaml"]
 
 
-def _copy_files_to_new_dir(files: Set[Text]) -> Text:
-    directory = tempfile.mkdtemp()
+def _copy_files_to_new_dir(files: Set[Text], directory: Optional[Text] = None) -> Text:
+    if directory is None:
+        directory = tempfile.mkdtemp()
+    else:
+        os.mkdir(directory)
+
     for f in files:
         # makes sure files do not overwrite each other, hence the prefix
         unique_prefix = uuid.uuid4().hex
         unique_file_name = unique_prefix + "_" + os.path.basename(f)
-        shutil.copy2(f, os.path.join(directory, unique_file_name))
+        _link_or_copy_file(f, os.path.join(directory, unique_file_name))
 
     return directory
+
+
+def _link_or_copy_file(source: Text, target: Text) -> None:
+    # the training files are only read, hence a hard link is enough and
+    # avoids copying their content. Hard links are not supported by every
+    # file system and don't work across file systems, though.
+    try:
+        os.link(source, target)
+    except (AttributeError, OSError):
+        shutil.copy2(source, target)
@@ -3,23 +3,28 @@ import logging
 import os
 import shutil
 import tempfile
+import typing
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Text, Tuple, Union, Optional, List, Dict
 
 import yaml.parser
 
 import rasa.utils.io
 from rasa.constants import (
+    DEFAULT_DOMAIN_PATH,
     DEFAULT_MODELS_PATH,
     CONFIG_MANDATORY_KEYS_CORE,
     CONFIG_MANDATORY_KEYS_NLU,
     CONFIG_MANDATORY_KEYS,
 )
-
-from rasa.core.domain import Domain
-from rasa.core.utils import get_dict_hash
 from rasa.exceptions import ModelNotFound
 from rasa.utils.common import TempDirectoryPath
 
+if typing.TYPE_CHECKING:
+    import tarfile
+    from rasa.core.domain import Domain
+
 # Type alias for the fingerprint
 Fingerprint = Dict[Text, Union[Text, List[Text], int, float]]
 
@@ -31,9 +36,12 @@ FINGERPRINT_CONFIG_KEY = "config"
 FINGERPRINT_CONFIG_CORE_KEY = "core-config"
 FINGERPRINT_CONFIG_NLU_KEY = "nlu-config"
 FINGERPRINT_DOMAIN_KEY = "domain"
+FINGERPRINT_NLG_KEY = "nlg"
 FINGERPRINT_RASA_VERSION_KEY = "version"
 FINGERPRINT_STORIES_KEY = "stories"
 FINGERPRINT_NLU_DATA_KEY = "messages"
+FINGERPRINT_STORIES_STATS_KEY = "stories-stats"
+FINGERPRINT_NLU_DATA_STATS_KEY = "messages-stats"
 FINGERPRINT_TRAINED_AT_KEY = "trained_at"
 
 
@@ -90,7 +98,9 @@ def get_latest_model(model_path: Text = DEFAULT_MODELS_PATH) -> Optional[Text]:
 
 
 def unpack_model(
-    model_file: Text, working_directory: Optional[Text] = None
+    model_file: Text,
+    working_directory: Optional[Text] = None,
+    subdirectories: Optional[List[Text]] = None,
 ) -> TempDirectoryPath:
     """Unpacks a zipped Rasa model.
 
@@ -98,6 +108,8 @@ def unpack_model(
         model_file: Path to zipped model.
         working_directory: Location where the model should be unpacked to.
                            If `None` a temporary directory will be created.
+        subdirectories: Names of the model subdirectories (e.g. `core`) which
+                        should be unpacked. If `None` everything is unpacked.
 
     Returns:
         Path to unpacked Rasa model.
@@ -114,7 +126,13 @@ def unpack_model(
     working_directory = str(working_directory)
 
     # All files are in a subdirectory.
-    tar.extractall(working_directory)
+    if subdirectories is None:
+        tar.extractall(working_directory)
+    else:
+        members = [
+            m for m in tar.getmembers() if m.name.split("/")[0] in subdirectories
+        ]
+        tar.extractall(working_directory, members)
     tar.close()
     logger.debug("Extracted model to '{}'.".format(working_directory))
 
@@ -162,19 +180,92 @@ def create_package_rasa(
     if not os.path.exists(output_directory):
         os.makedirs(output_directory)
 
-    with tarfile.open(output_filename, "w:gz") as tar:
-        for elem in os.scandir(training_directory):
-            tar.add(elem.path, arcname=elem.name)
+    # the archive is written next to its final location and only moved there
+    # once it is complete, so that an interrupted packaging never leaves a
+    # broken model behind which would be picked up as latest model
+    temp_filename = os.path.join(output_directory, ".{}.tmp".format(uuid.uuid4().hex))
+    try:
+        gzip_command = _parallel_gzip_command()
+        if not gzip_command or not _create_tar_gz_with_command(
+            training_directory, temp_filename, gzip_command
+        ):
+            with tarfile.open(temp_filename, "w:gz") as tar:
+                _add_directory_to_tar(tar, training_directory)
+
+        os.replace(temp_filename, output_filename)
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
 
     shutil.rmtree(training_directory)
     return output_filename
 
 
+def _add_directory_to_tar(tar: "tarfile.TarFile", directory: Text) -> None:
+    # list the entries first so the iterator is closed even if adding fails
+    for elem in list(os.scandir(directory)):
+        tar.add(elem.path, arcname=elem.name)
+
+
+def _parallel_gzip_command() -> Optional[List[Text]]:
+    """Returns the command of a gzip implementation which compresses on all
+    cores, or `None` if there is none."""
+
+    pigz = shutil.which("pigz")
+    if pigz:
+        return [pigz, "--processes", str(os.cpu_count() or 1)]
+    return None
+
+
+def _create_tar_gz_with_command(
+    directory: Text, output_filename: Text, gzip_command: List[Text]
+) -> bool:
+    """Creates a gzipped tar archive by piping the tar stream through
+    `gzip_command`.
+
+    Returns:
+        `True` if the archive was created, else `False`.
+    """
+    import subprocess
+    import tarfile
+
+    try:
+        with open(output_filename, "wb") as f:
+            process = subprocess.Popen(gzip_command, stdin=subprocess.PIPE, stdout=f)
+            try:
+                with tarfile.open(fileobj=process.stdin, mode="w|") as tar:
+                    _add_directory_to_tar(tar, directory)
+            finally:
+                # the process only exits once its input is closed
+                try:
+                    process.stdin.close()
+                finally:
+                    return_code = process.wait()
+    except OSError as e:
+        logger.debug(
+            "Failed to compress the model with '{}'. Error: {}".format(
+                gzip_command[0], e
+            )
+        )
+        return False
+
+    if return_code != 0:
+        logger.debug(
+            "Failed to compress the model with '{}'. Exit code: {}".format(
+                gzip_command[0], return_code
+            )
+        )
+        return False
+
+    return True
+
+
 def model_fingerprint(
     config_file: Text,
-    domain: Optional[Union[Domain, Text]] = None,
+    domain: Optional[Union["Domain", Text]] = None,
     nlu_data: Optional[Text] = None,
     stories: Optional[Text] = None,
+    previous: Optional[Fingerprint] = None,
 ) -> Fingerprint:
     """Creates a model fingerprint from its used configuration and training
     data.
@@ -184,6 +275,10 @@ def model_fingerprint(
         domain: Path to the models domain file.
         nlu_data: Path to the used NLU training data.
         stories: Path to the used story training data.
+        previous: Fingerprint of a previously trained model. The hashes of the
+                  training data are taken from it instead of hashing the files
+                  again if the size and modification time of the files did not
+                  change.
 
     Returns:
         The fingerprint.
@@ -191,11 +286,25 @@ def model_fingerprint(
     """
     import rasa
     import time
+    from rasa.core.domain import Domain
 
     if isinstance(domain, Domain):
-        domain_hash = hash(domain)
+        domain_hash, templates_hash = _get_hashes_of_domain(domain)
     else:
         domain_hash = _get_hashes_for_paths(domain)
+        templates_hash = ""
+
+    previous = previous or {}
+    nlu_data_hashes, nlu_data_stats = _get_hashes_and_stats_for_paths(
+        nlu_data,
+        previous.get(FINGERPRINT_NLU_DATA_KEY),
+        previous.get(FINGERPRINT_NLU_DATA_STATS_KEY),
+    )
+    stories_hashes, stories_stats = _get_hashes_and_stats_for_paths(
+        stories,
+        previous.get(FINGERPRINT_STORIES_KEY),
+        previous.get(FINGERPRINT_STORIES_STATS_KEY),
+    )
 
     return {
         FINGERPRINT_CONFIG_KEY: _get_hash_of_config(
@@ -208,25 +317,86 @@ def model_fingerprint(
             config_file, include_keys=CONFIG_MANDATORY_KEYS_NLU
         ),
         FINGERPRINT_DOMAIN_KEY: domain_hash,
-        FINGERPRINT_NLU_DATA_KEY: _get_hashes_for_paths(nlu_data),
-        FINGERPRINT_STORIES_KEY: _get_hashes_for_paths(stories),
+        FINGERPRINT_NLG_KEY: templates_hash,
+        FINGERPRINT_NLU_DATA_KEY: nlu_data_hashes,
+        FINGERPRINT_NLU_DATA_STATS_KEY: nlu_data_stats,
+        FINGERPRINT_STORIES_KEY: stories_hashes,
+        FINGERPRINT_STORIES_STATS_KEY: stories_stats,
         FINGERPRINT_TRAINED_AT_KEY: time.time(),
         FINGERPRINT_RASA_VERSION_KEY: rasa.__version__,
     }
 
 
-def _get_hashes_for_paths(path: Text) -> List[Text]:
-    from rasa.core.utils import get_file_hash
+def _get_hashes_of_domain(domain: "Domain") -> Tuple[Text, Text]:
+    """Hashes the templates of a domain separately from the rest of it.
+
+    The Core model does not depend on the templates, hence changing them does
+    not require to retrain it.
+    """
+    from rasa.core.utils import get_dict_hash
+    from rasa.utils.common import sort_list_of_dicts_by_first_key
+
+    domain_dict = domain.as_dict()
+    templates = domain_dict.pop("templates")
+    domain_dict["intents"] = sort_list_of_dicts_by_first_key(domain_dict["intents"])
 
-    files = []
+    return get_dict_hash(domain_dict), get_dict_hash(templates)
+
+
+def _get_files_for_path(path: Text) -> List[Text]:
     if path and os.path.isdir(path):
-        files = [
+        return [
             os.path.join(path, f) for f in os.listdir(path) if not f.startswith(".")
         ]
     elif path and os.path.isfile(path):
-        files = [path]
+        return [path]
+    return []
+
+
+def _get_hashes_for_files(files: List[Text]) -> List[Text]:
+    from rasa.core.utils import get_file_hash
+
+    if len(files) < 2:
+        return [get_file_hash(f) for f in files]
+
+    # `hashlib` releases the GIL while hashing, so the files can be read and
+    # hashed in parallel
+    max_workers = min(len(files), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(get_file_hash, files))
+
+
+def _get_hashes_for_paths(path: Text) -> List[Text]:
+    files = _get_files_for_path(path)
+
+    return sorted(_get_hashes_for_files(files))
 
-    return sorted([get_file_hash(f) for f in files])
+
+def _get_hashes_and_stats_for_paths(
+    path: Text,
+    previous_hashes: Optional[List[Text]] = None,
+    previous_stats: Optional[List[Text]] = None,
+) -> Tuple[List[Text], List[Text]]:
+    """Returns the hashes of the files at `path` together with their sizes
+    and modification times.
+
+    If the sizes and modification times match `previous_stats`, the files are
+    considered unchanged and `previous_hashes` are returned without reading
+    the files.
+    """
+
+    files = _get_files_for_path(path)
+
+    stats = []
+    for f in files:
+        stat = os.stat(f)
+        stats.append("{}-{}".format(stat.st_size, stat.st_mtime_ns))
+    stats.sort()
+
+    if previous_hashes is not None and stats == previous_stats:
+        return previous_hashes, stats
+
+    return sorted(_get_hashes_for_files(files)), stats
 
 
 def _get_hash_of_config(
@@ -234,11 +404,17 @@ def _get_hash_of_config(
     include_keys: Optional[List[Text]] = None,
     exclude_keys: Optional[List[Text]] = None,
 ) -> Text:
+    from rasa.core.utils import get_dict_hash
+
     if not config_path or not os.path.exists(config_path):
         return ""
 
     try:
-        config_dict = rasa.utils.io.read_config_file(config_path)
+        # the same config is hashed multiple times for one fingerprint, hence
+        # it is only parsed once
+        config_dict = rasa.utils.io.read_file_with_cache(
+            config_path, rasa.utils.io.read_config_file
+        )
         keys = include_keys or list(
             filter(lambda k: k not in exclude_keys, config_dict.keys())
         )
@@ -273,6 +449,33 @@ def fingerprint_from_path(model_path: Text) -> Fingerprint:
         return {}
 
 
+def fingerprint_from_model(model_file: Optional[Text]) -> Fingerprint:
+    """Loads the persisted fingerprint of a zipped model without unpacking it.
+
+    Args:
+        model_file: Path to the zipped model.
+
+    Returns:
+        The fingerprint or an empty dict if no fingerprint was found.
+    """
+    import json
+    import tarfile
+
+    if not model_file or not os.path.isfile(model_file):
+        return {}
+
+    with tarfile.open(model_file) as tar:
+        try:
+            fingerprint_file = tar.extractfile(FINGERPRINT_FILE_PATH)
+        except KeyError:
+            return {}
+
+        if fingerprint_file is None:
+            return {}
+
+        return json.loads(fingerprint_file.read().decode("utf-8"))
+
+
 def persist_fingerprint(output_path: Text, fingerprint: Fingerprint):
     """Persists a model fingerprint.
 
@@ -343,6 +546,25 @@ def nlu_fingerprint_changed(
     return False
 
 
+def nlg_fingerprint_changed(
+    fingerprint1: Fingerprint, fingerprint2: Fingerprint
+) -> bool:
+    """Checks whether the templates of the domain changed.
+
+    Args:
+        fingerprint1: A fingerprint.
+        fingerprint2: Another fingerprint.
+
+    Returns:
+        `True` if the templates changed, else `False`.
+
+    """
+    if fingerprint1.get(FINGERPRINT_NLG_KEY) != fingerprint2.get(FINGERPRINT_NLG_KEY):
+        logger.info("Templates of the domain changed.")
+        return True
+    return False
+
+
 def merge_model(source: Text, target: Text) -> bool:
     """Merges two model directories.
 
@@ -362,13 +584,23 @@ def merge_model(source: Text, target: Text) -> bool:
         return False
 
 
-def should_retrain(new_fingerprint: Fingerprint, old_model: Text, train_path: Text):
+def should_retrain(
+    new_fingerprint: Fingerprint,
+    old_model: Text,
+    train_path: Text,
+    old_fingerprint: Optional[Fingerprint] = None,
+    nlg_changed: Optional[bool] = None,
+):
     """Checks which component of a model should be retrained.
 
     Args:
         new_fingerprint: The fingerprint of the new model to be trained.
         old_model: Path to the old zipped model file.
         train_path: Path to the directory in which the new model will be trained.
+        old_fingerprint: The fingerprint of the old model. If `None` it is
+                         loaded from `old_model`.
+        nlg_changed: Whether the templates of the domain changed. If `None` it
+                     is determined from the fingerprints.
 
     Returns:
         A tuple of boolean values indicating whether Rasa Core and/or Rasa NLU needs
@@ -380,17 +612,46 @@ def should_retrain(new_fingerprint: Fingerprint, old_model: Text, train_path: Te
     if old_model is None or not os.path.exists(old_model):
         return retrain_core, retrain_nlu
 
-    with unpack_model(old_model) as unpacked:
-        last_fingerprint = fingerprint_from_path(unpacked)
+    if old_fingerprint is None:
+        old_fingerprint = fingerprint_from_model(old_model)
+
+    core_changed = core_fingerprint_changed(old_fingerprint, new_fingerprint)
+    nlu_changed = nlu_fingerprint_changed(old_fingerprint, new_fingerprint)
+    if nlg_changed is None:
+        nlg_changed = nlg_fingerprint_changed(old_fingerprint, new_fingerprint)
 
+    if not core_changed and not nlu_changed and not nlg_changed:
+        # the old model can be used as it is, so there is no need to unpack it
+        return False, False
+
+    # only unpack the parts of the old model which can be reused
+    unchanged = []
+    if not core_changed:
+        unchanged.append("core")
+    if not nlu_changed:
+        unchanged.append("nlu")
+
+    with unpack_model(old_model, subdirectories=unchanged) as unpacked:
         old_core, old_nlu = get_model_subdirectories(unpacked)
 
-        if not core_fingerprint_changed(last_fingerprint, new_fingerprint):
+        if not core_changed:
             target_path = os.path.join(train_path, "core")
             retrain_core = not merge_model(old_core, target_path)
 
-        if not nlu_fingerprint_changed(last_fingerprint, new_fingerprint):
+        if not nlu_changed:
             target_path = os.path.join(train_path, "nlu")
             retrain_nlu = not merge_model(old_nlu, target_path)
 
         return retrain_core, retrain_nlu
+
+
+def update_model_with_new_domain(domain: "Domain", unpacked_model_path: Text) -> None:
+    """Overwrites the domain of an unpacked model with a new domain.
+
+    Args:
+        domain: The new domain.
+        unpacked_model_path: Path to the unpacked model.
+
+    """
+    core_directory = os.path.join(unpacked_model_path, "core")
+    domain.persist(os.path.join(core_directory, DEFAULT_DOMAIN_PATH))
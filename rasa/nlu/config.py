@@ -24,7 +24,12 @@ def load(filename: Optional[Text] = None, **kwargs: Any) -> "RasaNLUModelConfig"
 
     if filename is not None:
         try:
-            file_config = rasa.utils.io.read_config_file(filename)
+            # the cached content is shared, hence it has to be copied
+            file_config = copy.deepcopy(
+                rasa.utils.io.read_file_with_cache(
+                    filename, rasa.utils.io.read_config_file
+                )
+            )
         except yaml.parser.ParserError as e:
             raise InvalidConfigError(
                 "Failed to read configuration file "
@@ -38,16 +43,29 @@ def load(filename: Optional[Text] = None, **kwargs: Any) -> "RasaNLUModelConfig"
         return RasaNLUModelConfig(kwargs)
 
 
+# config values of these types can be shared between configs without copying
+IMMUTABLE_CONFIG_TYPES = (str, int, float, bool, type(None))
+
+
 def override_defaults(
     defaults: Optional[Dict[Text, Any]], custom: Optional[Dict[Text, Any]]
 ) -> Dict[Text, Any]:
+    if not custom:
+        custom = {}
+
     if defaults:
-        cfg = copy.deepcopy(defaults)
+        # only mutable values need to be copied, values which are overridden
+        # anyways don't need to be copied at all
+        cfg = {
+            k: v
+            if k in custom or isinstance(v, IMMUTABLE_CONFIG_TYPES)
+            else copy.deepcopy(v)
+            for k, v in defaults.items()
+        }
     else:
         cfg = {}
 
-    if custom:
-        cfg.update(custom)
+    cfg.update(custom)
     return cfg
 
 
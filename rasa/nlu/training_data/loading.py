@@ -4,7 +4,7 @@ import os
 
 import requests
 import typing
-from typing import Optional, Text
+from typing import Any, Optional, Text, Tuple
 
 import rasa.utils.io
 from rasa.nlu import utils
@@ -114,15 +114,23 @@ def _reader_factory(fformat: Text) -> Optional["TrainingDataReader"]:
 
 def _load(filename: Text, language: Optional[Text] = "en") -> Optional["TrainingData"]:
     """Loads a single training data file from disk."""
+    from rasa.nlu.training_data.formats import MarkdownReader
+    from rasa.nlu.training_data.formats.readerwriter import JsonTrainingDataReader
 
-    fformat = guess_format(filename)
+    # read and parse the file only once for guessing its format and loading it
+    content = rasa.utils.io.read_file(filename)
+    fformat, js = _guess_format_of_content(content, filename)
     if fformat == UNK:
         raise ValueError("Unknown data format for file '{}'.".format(filename))
 
     logger.info("Training data format of '{}' is '{}'.".format(filename, fformat))
     reader = _reader_factory(fformat)
 
-    if reader:
+    if isinstance(reader, JsonTrainingDataReader):
+        return reader.read_from_json(js, language=language, fformat=fformat)
+    elif isinstance(reader, MarkdownReader):
+        return reader.reads(content, language=language, fformat=fformat)
+    elif reader:
         return reader.read(filename, language=language, fformat=fformat)
     else:
         return None
@@ -137,22 +145,33 @@ def guess_format(filename: Text) -> Text:
     Returns:
         Guessed file format.
     """
-    guess = UNK
-
     content = ""
     try:
         content = rasa.utils.io.read_file(filename)
+    except ValueError:
+        pass
+
+    return _guess_format_of_content(content, filename)[0]
+
+
+def _guess_format_of_content(content: Text, filename: Text) -> Tuple[Text, Any]:
+    """Guesses the data format of the content of a file.
+
+    Returns:
+        Guessed file format and the parsed json if the content is json.
+    """
+    try:
         js = json.loads(content)
     except ValueError:
         if any([marker in content for marker in _markdown_section_markers]):
-            guess = MARKDOWN
-    else:
-        for fformat, format_heuristic in _json_format_heuristics.items():
-            if format_heuristic(js, filename):
-                guess = fformat
-                break
+            return MARKDOWN, None
+        return UNK, None
+
+    for fformat, format_heuristic in _json_format_heuristics.items():
+        if format_heuristic(js, filename):
+            return fformat, js
 
-    return guess
+    return UNK, js
 
 
 def _guess_format(filename: Text) -> Text:
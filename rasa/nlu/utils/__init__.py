@@ -4,7 +4,7 @@ import io
 import json
 import os
 import re
-from typing import Any, Callable, Dict, List, Optional, Text
+from typing import Any, Callable, Dict, List, Optional, Text, Type
 
 # backwards compatibility 1.0.x
 # noinspection PyUnresolvedReferences
@@ -76,22 +76,27 @@ def list_subdirectories(path: Text) -> List[Text]:
     return [fn for fn in glob.glob(os.path.join(path, "*")) if os.path.isdir(fn)]
 
 
-def lazyproperty(fn: Callable) -> Any:
+# noinspection PyPep8Naming
+class lazyproperty(object):
     """Allows to avoid recomputing a property over and over.
 
-    The result gets stored in a local var. Computation of the property
-    will happen once, on the first call of the property. All
-    succeeding calls will use the value stored in the private property."""
+    Computation of the property will happen once, on the first call of the
+    property. The result gets stored in the instance under the name of the
+    property, so all succeeding calls read the value directly without calling
+    this descriptor again."""
 
-    attr_name = "_lazy_" + fn.__name__
+    def __init__(self, fn: Callable) -> None:
+        self.fn = fn
+        self.name = fn.__name__
+        self.__doc__ = fn.__doc__
 
-    @property
-    def _lazyprop(self):
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+    def __get__(self, instance: Any, owner: Optional[Type] = None) -> Any:
+        if instance is None:
+            return self
 
-    return _lazyprop
+        value = self.fn(instance)
+        instance.__dict__[self.name] = value
+        return value
 
 
 def list_to_str(l: List[Text], delim: Text = ", ", quote: Text = "'") -> Text:
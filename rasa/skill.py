@@ -86,7 +86,7 @@ class SkillSelector:
 
         path = os.path.abspath(path)
         if os.path.exists(path) and data.is_config_file(path):
-            config = io_utils.read_config_file(path)
+            config = io_utils.read_file_with_cache(path, io_utils.read_config_file)
 
             parent_directory = os.path.dirname(path)
             return cls._from_dict(config, parent_directory, skill_selector)
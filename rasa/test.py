@@ -4,8 +4,6 @@ import tempfile
 from typing import Text, Dict, Optional, List, Any
 import os
 
-from rasa.core.interpreter import RegexInterpreter
-
 from rasa.constants import DEFAULT_RESULTS_PATH, RESULTS_FILE
 from rasa.model import get_model, get_model_subdirectories, unpack_model
 from rasa.cli.utils import minimal_kwargs, print_error, print_warning
@@ -54,7 +52,7 @@ def test_core(
     import rasa.core.utils as core_utils
     from rasa.nlu import utils as nlu_utils
     from rasa.model import get_model
-    from rasa.core.interpreter import NaturalLanguageInterpreter
+    from rasa.core.interpreter import RegexInterpreter, NaturalLanguageInterpreter
     from rasa.core.agent import Agent
 
     _endpoints = core_utils.AvailableEndpoints.read_endpoints(endpoints)
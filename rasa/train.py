@@ -1,11 +1,17 @@
 import asyncio
+import functools
+import logging
+import multiprocessing
 import os
+import sys
 import tempfile
+import typing
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import ExitStack
-from typing import Text, Optional, List, Union, Dict
+from typing import Any, Callable, Text, Optional, List, Tuple, Union, Dict
 
+import rasa.utils.io
 from rasa import model, data
-from rasa.core.domain import Domain, InvalidDomain
 from rasa.model import Fingerprint, should_retrain
 from rasa.skill import SkillSelector
 from rasa.utils.common import TempDirectoryPath
@@ -18,7 +24,10 @@ from rasa.cli.utils import (
     bcolors,
     print_color,
 )
-from rasa.constants import DEFAULT_MODELS_PATH
+from rasa.constants import DEFAULT_MODELS_PATH, ENV_TRAIN_IN_SEPARATE_PROCESSES
+
+if typing.TYPE_CHECKING:
+    from rasa.core.domain import Domain
 
 
 def train(
@@ -30,6 +39,9 @@ def train(
     fixed_model_name: Optional[Text] = None,
     kwargs: Optional[Dict] = None,
 ) -> Optional[Text]:
+    """Trains a Rasa model (Core and NLU) using the event loop of the current
+    thread. Use `train_async` if an event loop is already running."""
+
     loop = asyncio.get_event_loop()
     return loop.run_until_complete(
         train_async(
@@ -45,7 +57,7 @@ def train(
 
 
 async def train_async(
-    domain: Union[Domain, Text],
+    domain: Union["Domain", Text],
     config: Text,
     training_files: Optional[Union[Text, List[Text]]],
     output_path: Text = DEFAULT_MODELS_PATH,
@@ -67,6 +79,12 @@ async def train_async(
     Returns:
         Path of the trained model archive.
     """
+    from rasa.core.domain import Domain, InvalidDomain
+
+    if force_training:
+        # make sure that all files are read again
+        rasa.utils.io.clear_file_cache()
+
     skill_imports = SkillSelector.load(config, training_files)
     try:
         domain = Domain.load(domain, skill_imports)
@@ -74,37 +92,55 @@ async def train_async(
     except InvalidDomain:
         domain = None
 
-    story_directory, nlu_data_directory = data.get_core_nlu_directories(
-        training_files, skill_imports
-    )
-
-    with ExitStack() as stack:
-        train_path = stack.enter_context(TempDirectoryPath(tempfile.mkdtemp()))
-        nlu_data = stack.enter_context(TempDirectoryPath(nlu_data_directory))
-        story = stack.enter_context(TempDirectoryPath(story_directory))
+    # copying the training data and creating the temporary directories block,
+    # hence they are run in the default executor
+    loop = asyncio.get_event_loop()
 
-        if domain is None:
+    if domain is None:
+        # only an NLU model can be trained, so there is no need to stage the
+        # stories or to create a train directory
+        nlu_data_directory = await loop.run_in_executor(
+            None, data.get_nlu_directory, training_files, skill_imports
+        )
+        with TempDirectoryPath(nlu_data_directory):
             return handle_domain_if_not_exists(
                 config, nlu_data_directory, output_path, fixed_model_name
             )
 
+    temp_directory = await loop.run_in_executor(None, tempfile.mkdtemp)
+
+    # the staged training data and the trained models share one temporary
+    # directory, so that there is only one directory to clean up
+    with TempDirectoryPath(temp_directory):
+        (
+            story_directory,
+            nlu_data_directory,
+            dialogue_data_present,
+            nlu_data_present,
+        ) = await loop.run_in_executor(
+            None,
+            data.get_core_nlu_directories_with_data_flags,
+            training_files,
+            skill_imports,
+            temp_directory,
+        )
+        train_path = os.path.join(temp_directory, "train")
+        os.mkdir(train_path)
+
         return await _train_async_internal(
             domain,
             config,
             train_path,
-            nlu_data,
-            story,
+            nlu_data_directory,
+            story_directory,
+            dialogue_data_present,
+            nlu_data_present,
             output_path,
             force_training,
             fixed_model_name,
             kwargs,
         )
 
-    if domain is None:
-        return handle_domain_if_not_exists(
-            config, nlu_data_directory, output_path, fixed_model_name
-        )
-
 
 def handle_domain_if_not_exists(
     config, nlu_data_directory, output_path, fixed_model_name
@@ -123,11 +159,13 @@ def handle_domain_if_not_exists(
 
 
 async def _train_async_internal(
-    domain: Union[Domain, Text],
+    domain: Union["Domain", Text],
     config: Text,
     train_path: Text,
     nlu_data_directory: Text,
     story_directory: Text,
+    dialogue_data_present: bool,
+    nlu_data_present: bool,
     output_path: Text,
     force_training: bool,
     fixed_model_name: Optional[Text],
@@ -141,6 +179,8 @@ async def _train_async_internal(
         train_path: Directory in which to train the model.
         nlu_data_directory: Path to NLU training files.
         story_directory: Path to Core training files.
+        dialogue_data_present: `True` if `story_directory` contains any files.
+        nlu_data_present: `True` if `nlu_data_directory` contains any files.
         output_path: Output path.
         force_training: If `True` retrain model even if data has not changed.
         fixed_model_name: Name of model to be stored.
@@ -149,12 +189,8 @@ async def _train_async_internal(
     Returns:
         Path of the trained model archive.
     """
-    new_fingerprint = model.model_fingerprint(
-        config, domain, nlu_data_directory, story_directory
-    )
-
-    dialogue_data_not_present = not os.listdir(story_directory)
-    nlu_data_not_present = not os.listdir(nlu_data_directory)
+    dialogue_data_not_present = not dialogue_data_present
+    nlu_data_not_present = not nlu_data_present
 
     if dialogue_data_not_present and nlu_data_not_present:
         print_error(
@@ -185,10 +221,43 @@ async def _train_async_internal(
             kwargs=kwargs,
         )
 
-    old_model = model.get_latest_model(output_path)
-    retrain_core, retrain_nlu = should_retrain(new_fingerprint, old_model, train_path)
+    # don't block the event loop with file system operations
+    loop = asyncio.get_event_loop()
+
+    old_model, old_fingerprint = await loop.run_in_executor(
+        None, _get_latest_model_and_fingerprint, output_path
+    )
 
-    if force_training or retrain_core or retrain_nlu:
+    # reuse the data hashes of the old model for unchanged training files,
+    # unless the user explicitly asked for a fresh model
+    new_fingerprint = await loop.run_in_executor(
+        None,
+        functools.partial(
+            model.model_fingerprint,
+            config,
+            domain,
+            nlu_data_directory,
+            story_directory,
+            previous=None if force_training else old_fingerprint,
+        ),
+    )
+    nlg_changed = old_model is not None and model.nlg_fingerprint_changed(
+        old_fingerprint, new_fingerprint
+    )
+    retrain_core, retrain_nlu = await loop.run_in_executor(
+        None,
+        should_retrain,
+        new_fingerprint,
+        old_model,
+        train_path,
+        old_fingerprint,
+        nlg_changed,
+    )
+    # the Core model does not depend on the templates, so it is kept if only
+    # they changed and just its domain is updated
+    update_templates = nlg_changed and not (force_training or retrain_core)
+
+    if force_training or retrain_core or retrain_nlu or update_templates:
         await _do_training(
             domain=domain,
             config=config,
@@ -199,6 +268,7 @@ async def _train_async_internal(
             force_training=force_training,
             retrain_core=retrain_core,
             retrain_nlu=retrain_nlu,
+            update_templates=update_templates,
             fixed_model_name=fixed_model_name,
             kwargs=kwargs,
         )
@@ -217,8 +287,41 @@ async def _train_async_internal(
     return old_model
 
 
+def _get_latest_model_and_fingerprint(
+    output_path: Text
+) -> Tuple[Optional[Text], Fingerprint]:
+    """Gets the latest model in `output_path` and its fingerprint.
+
+    Both are cached as long as the directory and the model don't change, so
+    that repeated trainings don't have to list the models and open the latest
+    one again. The returned fingerprint must not be modified.
+    """
+
+    if not os.path.isdir(output_path):
+        old_model = model.get_latest_model(output_path)
+    else:
+        old_model = rasa.utils.io.read_file_with_cache(
+            output_path, model.get_latest_model
+        )
+        if old_model:
+            # keep the path relative to `output_path` as without the cache
+            old_model = os.path.join(output_path, os.path.basename(old_model))
+        if old_model and not os.path.isfile(old_model):
+            # the model was removed without changing the modification time
+            # of the directory
+            old_model = model.get_latest_model(output_path)
+
+    if old_model is None:
+        return None, {}
+
+    old_fingerprint = rasa.utils.io.read_file_with_cache(
+        old_model, model.fingerprint_from_model
+    )
+    return old_model, old_fingerprint
+
+
 async def _do_training(
-    domain: Union[Domain, Text],
+    domain: Union["Domain", Text],
     config: Text,
     nlu_data_directory: Optional[Text],
     story_directory: Optional[Text],
@@ -227,43 +330,151 @@ async def _do_training(
     force_training: bool = False,
     retrain_core: bool = True,
     retrain_nlu: bool = True,
+    update_templates: bool = False,
     fixed_model_name: Optional[Text] = None,
     kwargs: Optional[Dict] = None,
 ):
+    # Core and NLU models are independent of each other (and are trained into
+    # different subdirectories of `train_path`), hence they can be trained
+    # at the same time if each of them is trained in its own process
+    train_core = force_training or retrain_core
+    train_nlu = force_training or retrain_nlu
+    core_arguments = dict(
+        domain=domain,
+        config=config,
+        story_directory=story_directory,
+        output=output_path,
+        train_path=train_path,
+        fixed_model_name=fixed_model_name,
+        kwargs=kwargs,
+    )
+    nlu_arguments = dict(
+        config=config,
+        nlu_data_directory=nlu_data_directory,
+        output=output_path,
+        train_path=train_path,
+        fixed_model_name=fixed_model_name,
+    )
 
-    if force_training or retrain_core:
-        await _train_core_with_validated_data(
-            domain=domain,
-            config=config,
-            story_directory=story_directory,
-            output=output_path,
-            train_path=train_path,
-            fixed_model_name=fixed_model_name,
-            kwargs=kwargs,
-        )
-    else:
-        print_color(
-            "Core stories/configuration did not change. No need to retrain Core model.",
-            color=bcolors.OKBLUE,
-        )
+    loop = asyncio.get_event_loop()
+    trainings = []
 
-    if force_training or retrain_nlu:
-        _train_nlu_with_validated_data(
-            config=config,
-            nlu_data_directory=nlu_data_directory,
-            output=output_path,
-            train_path=train_path,
-            fixed_model_name=fixed_model_name,
-        )
-    else:
-        print_color(
-            "NLU data/configuration did not change. No need to retrain NLU model.",
-            color=bcolors.OKBLUE,
-        )
+    with ExitStack() as stack:
+        processes = None
+        if train_core and train_nlu:
+            # if both models are trained, each of them is trained in its own
+            # process so that they neither compete for the GIL nor share any
+            # TensorFlow state
+            processes = _training_processes()
+        if processes is not None:
+            stack.enter_context(processes)
+
+        if train_core and processes is not None:
+            trainings.append(
+                loop.run_in_executor(
+                    processes,
+                    functools.partial(
+                        _train_in_process,
+                        _train_core_with_validated_data,
+                        logging.getLogger("rasa").getEffectiveLevel(),
+                        **core_arguments
+                    ),
+                )
+            )
+        elif train_core:
+            await _train_core_with_validated_data(**core_arguments)
+        elif update_templates:
+            print_color(
+                "Core stories/configuration did not change. Only the templates "
+                "section of the domain changed. The Core model is updated with the "
+                "new templates.",
+                color=bcolors.OKBLUE,
+            )
+            model.update_model_with_new_domain(domain, train_path)
+        else:
+            print_color(
+                "Core stories/configuration did not change. No need to retrain Core model.",
+                color=bcolors.OKBLUE,
+            )
+
+        if train_nlu and processes is not None:
+            trainings.append(
+                loop.run_in_executor(
+                    processes,
+                    functools.partial(
+                        _train_in_process,
+                        _train_nlu_with_validated_data,
+                        logging.getLogger("rasa").getEffectiveLevel(),
+                        **nlu_arguments
+                    ),
+                )
+            )
+        elif train_nlu:
+            # within the same process both trainings share global state (e.g.
+            # the random number generator of numpy), hence they run one after
+            # the other
+            _train_nlu_with_validated_data(**nlu_arguments)
+        else:
+            print_color(
+                "NLU data/configuration did not change. No need to retrain NLU model.",
+                color=bcolors.OKBLUE,
+            )
+
+        # wait for all trainings to finish before raising any error, otherwise a
+        # still running training might write into an already removed `train_path`
+        results = await asyncio.gather(*trainings, return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def _training_processes() -> Optional[ProcessPoolExecutor]:
+    """Creates a pool of two fresh Python processes to train models in.
+
+    Training in separate processes has to be enabled with the environment
+    variable `RASA_TRAIN_IN_SEPARATE_PROCESSES`. Returns `None` if it is not
+    enabled, if there is only one CPU or if the processes can't be started
+    with the `spawn` method (which requires Python 3.7). Forking the current
+    process is not an option as TensorFlow might already be initialized in it.
+    """
+
+    enabled = os.environ.get(ENV_TRAIN_IN_SEPARATE_PROCESSES, "false").lower()
+    if enabled not in ["true", "1"]:
+        return None
+
+    if sys.version_info < (3, 7) or (os.cpu_count() or 1) < 2:
+        return None
+
+    return ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _train_in_process(
+    train_function: Callable, log_level: int, **kwargs: Any
+) -> Optional[Text]:
+    """Runs a training function in a process of `_training_processes`."""
+
+    from rasa.utils.common import set_log_level
+
+    # the spawned process doesn't inherit the logging configuration
+    set_log_level(log_level)
+    rasa.utils.io.configure_colored_logging(logging.getLevelName(log_level))
+
+    result = train_function(**kwargs)
+    if asyncio.iscoroutine(result):
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(result)
+        finally:
+            loop.close()
+
+    return result
 
 
 def train_core(
-    domain: Union[Domain, Text],
+    domain: Union["Domain", Text],
     config: Text,
     stories: Text,
     output: Text,
@@ -271,6 +482,9 @@ def train_core(
     fixed_model_name: Optional[Text] = None,
     kwargs: Optional[Dict] = None,
 ) -> Optional[Text]:
+    """Trains a Core model using the event loop of the current thread. Use
+    `train_core_async` if an event loop is already running."""
+
     loop = asyncio.get_event_loop()
     return loop.run_until_complete(
         train_core_async(
@@ -286,7 +500,7 @@ def train_core(
 
 
 async def train_core_async(
-    domain: Union[Domain, Text],
+    domain: Union["Domain", Text],
     config: Text,
     stories: Text,
     output: Text,
@@ -308,10 +522,11 @@ async def train_core_async(
         kwargs: Additional training parameters.
 
     Returns:
-        If `train_path` is given it returns the path to the model archive,
-        otherwise the path to the directory with the trained model files.
+        If `train_path` is given it returns the path to the directory with the
+        trained model files, otherwise the path to the model archive.
 
     """
+    from rasa.core.domain import Domain, InvalidDomain
 
     skill_imports = SkillSelector.load(config, stories)
 
@@ -328,7 +543,7 @@ async def train_core_async(
     train_context = TempDirectoryPath(data.get_core_directory(stories, skill_imports))
 
     with train_context as story_directory:
-        if not os.listdir(story_directory):
+        if _is_empty(story_directory):
             print_error(
                 "No stories given. Please provide stories in order to "
                 "train a Rasa Core model using the '--stories' argument."
@@ -347,7 +562,7 @@ async def train_core_async(
 
 
 async def _train_core_with_validated_data(
-    domain: Domain,
+    domain: "Domain",
     config: Text,
     story_directory: Text,
     output: Text,
@@ -413,8 +628,8 @@ def train_nlu(
         uncompress: If `True` the model will not be compressed.
 
     Returns:
-        If `train_path` is given it returns the path to the model archive,
-        otherwise the path to the directory with the trained model files.
+        If `train_path` is given it returns the path to the directory with the
+        trained model files, otherwise the path to the model archive.
 
     """
 
@@ -423,7 +638,7 @@ def train_nlu(
     train_context = TempDirectoryPath(data.get_nlu_directory(nlu_data, skill_imports))
 
     with train_context as nlu_data_directory:
-        if not os.listdir(nlu_data_directory):
+        if _is_empty(nlu_data_directory):
             print_error(
                 "No NLU data given. Please provide NLU data in order to train "
                 "a Rasa NLU model using the '--nlu' argument."
@@ -439,6 +654,44 @@ def train_nlu(
         )
 
 
+async def train_nlu_async(
+    config: Text,
+    nlu_data: Text,
+    output: Text,
+    train_path: Optional[Text] = None,
+    fixed_model_name: Optional[Text] = None,
+) -> Optional[Text]:
+    """Trains an NLU model without blocking the event loop.
+
+    Args:
+        config: Path to the config file for NLU.
+        nlu_data: Path to the NLU training data.
+        output: Output path.
+        train_path: If `None` the model will be trained in a temporary
+            directory, otherwise in the provided directory.
+        fixed_model_name: Name of the model to be stored.
+
+    Returns:
+        If `train_path` is given it returns the path to the directory with the
+        trained model files, otherwise the path to the model archive.
+
+    """
+
+    # NLU training is blocking, hence it runs in the default executor
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(
+            train_nlu,
+            config=config,
+            nlu_data=nlu_data,
+            output=output,
+            train_path=train_path,
+            fixed_model_name=fixed_model_name,
+        ),
+    )
+
+
 def _train_nlu_with_validated_data(
     config: Text,
     nlu_data_directory: Text,
@@ -481,6 +734,18 @@ def _train_nlu_with_validated_data(
         return _train_path
 
 
+def _is_empty(directory: Text) -> bool:
+    """Checks whether a directory is empty without listing all of its files."""
+
+    entries = os.scandir(directory)
+    try:
+        return next(entries, None) is None
+    finally:
+        # the iterator can't be closed explicitly in Python 3.5
+        if hasattr(entries, "close"):
+            entries.close()
+
+
 def _package_model(
     new_fingerprint: Fingerprint,
     output_path: Text,
@@ -4,7 +4,6 @@ import shutil
 from typing import Any, Callable, Dict, List, Text, Optional, Type
 from types import TracebackType
 
-import rasa.core.utils
 import rasa.utils.io
 from rasa.constants import (
     GLOBAL_USER_CONFIG_PATH,
@@ -56,6 +55,8 @@ def read_global_config() -> Dict[Text, Any]:
 def write_global_config_value(name: Text, value: Any) -> None:
     """Read global Rasa configuration."""
 
+    import rasa.core.utils
+
     try:
         os.makedirs(os.path.dirname(GLOBAL_USER_CONFIG_PATH), exist_ok=True)
 
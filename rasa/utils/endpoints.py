@@ -2,7 +2,7 @@ import logging
 import os
 
 import aiohttp
-from typing import Any, Optional, Text, Dict
+from typing import Any, Optional, Text, Dict, List
 
 from sanic.request import Request
 
@@ -19,21 +19,38 @@ def read_endpoint_config(
     """Read an endpoint configuration file from disk and extract one
 
     config. """
-    if not filename:
-        return None
 
-    try:
-        content = rasa.utils.io.read_config_file(filename)
+    return read_endpoint_configs(filename, [endpoint_type])[endpoint_type]
 
-        if endpoint_type in content:
-            return EndpointConfig.from_dict(content[endpoint_type])
-        else:
-            return None
-    except FileNotFoundError:
-        logger.error(
-            "Failed to read endpoint configuration "
-            "from {}. No such file.".format(os.path.abspath(filename))
-        )
+
+def read_endpoint_configs(
+    filename: Text, endpoint_types: List[Text]
+) -> Dict[Text, Optional["EndpointConfig"]]:
+    """Read an endpoint configuration file from disk and extract multiple configs.
+
+    The file is only read and parsed once, no matter how many endpoint types
+    are extracted from it. Endpoint types which are not configured in the file
+    map to `None`."""
+
+    content = {}
+    if filename:
+        try:
+            content = rasa.utils.io.read_config_file(filename)
+        except FileNotFoundError:
+            logger.error(
+                "Failed to read endpoint configuration "
+                "from {}. No such file.".format(os.path.abspath(filename))
+            )
+
+    return {t: _endpoint_from_dict(content, t) for t in endpoint_types}
+
+
+def _endpoint_from_dict(
+    content: Dict[Text, Any], endpoint_type: Text
+) -> Optional["EndpointConfig"]:
+    if endpoint_type in content:
+        return EndpointConfig.from_dict(content[endpoint_type])
+    else:
         return None
 
 
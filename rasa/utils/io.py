@@ -4,10 +4,12 @@ import logging
 import os
 import tarfile
 import tempfile
+import threading
 import warnings
 import zipfile
 from asyncio import AbstractEventLoop
-from typing import Text, Any, Dict, Union, List, Type, Callable
+from collections import OrderedDict
+from typing import Text, Any, Dict, Union, List, Type, Callable, Tuple
 import ruamel.yaml as yaml
 from io import BytesIO as IOReader
 
@@ -173,6 +175,66 @@ def read_yaml_file(filename: Text) -> Union[List[Any], Dict[Text, Any]]:
     return read_yaml(read_file(filename, "utf-8"))
 
 
+# results of `read_file_with_cache` keyed by the loader and the file path,
+# ordered from the least to the most recently used file
+_file_cache = OrderedDict()  # type: Dict[Tuple[Callable, Text], Tuple[Any, Any]]
+# the cache is used from the event loop as well as from executor threads
+_file_cache_lock = threading.Lock()
+
+# maximum number of files kept in `_file_cache`
+FILE_CACHE_SIZE = 64
+
+
+def read_file_with_cache(filename: Text, loader: Callable[[Text], Any]) -> Any:
+    """Loads a file with `loader` unless it did not change since the last call.
+
+    Files are considered unchanged if their size and modification time are
+    the same. Only the `FILE_CACHE_SIZE` most recently used files are kept.
+    The loaded content is shared between the calls and must not be modified.
+    As unchanged files are not loaded again, environment variables referenced
+    in them (e.g. `${MY_VARIABLE}` in yaml files) are only read once.
+
+     Args:
+        filename: The path to the file which should be read.
+        loader: Function which loads the content from the file path.
+    """
+    path = os.path.abspath(filename)
+    key = (loader, path)
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # let the loader raise its own error for files which don't exist
+        with _file_cache_lock:
+            _file_cache.pop(key, None)
+        return loader(filename)
+
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _file_cache_lock:
+        cached = _file_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            _file_cache.move_to_end(key)
+            return cached[1]
+
+    # the file is loaded without holding the lock, so that loading one file
+    # doesn't block reading other files from the cache
+    content = loader(path)
+
+    with _file_cache_lock:
+        _file_cache[key] = (signature, content)
+        _file_cache.move_to_end(key)
+        while len(_file_cache) > FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    return content
+
+
+def clear_file_cache() -> None:
+    """Forces files read with `read_file_with_cache` to be loaded again."""
+
+    with _file_cache_lock:
+        _file_cache.clear()
+
+
 def unarchive(byte_array: bytes, directory: Text) -> Text:
     """Tries to unpack a byte array interpreting it as an archive.
 
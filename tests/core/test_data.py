@@ -76,6 +76,68 @@ def test_get_core_nlu_directories_with_none():
     assert all([not os.listdir(directory) for directory in directories])
 
 
+def test_get_core_nlu_directories_with_data_flags(project):
+    data_dir = os.path.join(project, "data")
+    stories_file = os.path.join(data_dir, "stories.md")
+
+    directories = data.get_core_nlu_directories_with_data_flags([data_dir])
+    assert directories[2:] == (True, True)
+
+    directories = data.get_core_nlu_directories_with_data_flags([stories_file])
+    assert directories[2:] == (True, False)
+    assert not os.listdir(directories[1])
+
+
+def test_get_core_nlu_directories_in_directory(project, tmpdir):
+    data_dir = os.path.join(project, "data")
+
+    directories = data.get_core_nlu_directories_with_data_flags(
+        [data_dir], directory=tmpdir.strpath
+    )
+
+    assert directories[:2] == (
+        tmpdir.join("stories").strpath,
+        tmpdir.join("nlu").strpath,
+    )
+    assert len(os.listdir(directories[0])) == 1
+    assert len(os.listdir(directories[1])) == 1
+
+
+def test_removing_core_directory_keeps_training_files(tmpdir):
+    stories_file = tmpdir.join("stories.md")
+    shutil.copy2(DEFAULT_STORIES_FILE, stories_file.strpath)
+
+    core_directory = data.get_core_directory([tmpdir.strpath])
+    staged_file = os.path.join(core_directory, os.listdir(core_directory)[0])
+
+    with open(staged_file, encoding="utf-8") as f:
+        assert f.read() == stories_file.read_text("utf-8")
+
+    shutil.rmtree(core_directory)
+
+    assert stories_file.check(file=1)
+
+
+def test_get_core_nlu_files_checks_only_training_files(tmpdir, monkeypatch):
+    shutil.copy2(DEFAULT_STORIES_FILE, tmpdir.join("stories.md").strpath)
+    tmpdir.join("README.txt").write("Some notes")
+    tmpdir.join("actions.py").write("")
+
+    checked_files = []
+    isfile = os.path.isfile
+
+    def counting_isfile(path):
+        checked_files.append(os.path.basename(path))
+        return isfile(path)
+
+    monkeypatch.setattr(os.path, "isfile", counting_isfile)
+    story_files, nlu_files = data.get_core_nlu_files([tmpdir.strpath])
+
+    assert checked_files == ["stories.md"]
+    assert len(story_files) == 1
+    assert not nlu_files
+
+
 def test_same_file_names_get_resolved(tmpdir):
     # makes sure the resolution properly handles if there are two files with
     # with the same name in different directories
@@ -1,3 +1,4 @@
+import copy
 import os
 import tempfile
 import time
@@ -15,17 +16,22 @@ from rasa.model import (
     FINGERPRINT_CONFIG_KEY,
     FINGERPRINT_DOMAIN_KEY,
     FINGERPRINT_FILE_PATH,
+    FINGERPRINT_NLG_KEY,
     FINGERPRINT_NLU_DATA_KEY,
+    FINGERPRINT_NLU_DATA_STATS_KEY,
     FINGERPRINT_RASA_VERSION_KEY,
     FINGERPRINT_STORIES_KEY,
+    FINGERPRINT_STORIES_STATS_KEY,
     FINGERPRINT_TRAINED_AT_KEY,
     core_fingerprint_changed,
     create_package_rasa,
     get_latest_model,
     get_model,
     get_model_subdirectories,
+    fingerprint_from_model,
     model_fingerprint,
     nlu_fingerprint_changed,
+    nlg_fingerprint_changed,
     Fingerprint,
     should_retrain,
     FINGERPRINT_CONFIG_CORE_KEY,
@@ -59,6 +65,15 @@ def test_get_model_context_manager(trained_model):
     assert not os.path.exists(unpacked)
 
 
+def test_unpack_model_subdirectories(trained_model):
+    from rasa.model import unpack_model
+
+    with unpack_model(trained_model, subdirectories=["core"]) as unpacked:
+        assert os.path.exists(os.path.join(unpacked, "core"))
+        assert not os.path.exists(os.path.join(unpacked, "nlu"))
+        assert not os.path.exists(os.path.join(unpacked, FINGERPRINT_FILE_PATH))
+
+
 @pytest.mark.parametrize("model_path", ["foobar", "rasa", "README.md", None])
 def test_get_model_exception(model_path):
     with pytest.raises(ModelNotFound):
@@ -81,6 +96,7 @@ def _fingerprint(
     rasa_version: Text = "1.0",
     stories: Optional[List[Text]] = None,
     nlu: Optional[List[Text]] = None,
+    nlg: Optional[List[Text]] = None,
 ):
     return {
         FINGERPRINT_CONFIG_KEY: config if config is not None else ["test"],
@@ -89,6 +105,7 @@ def _fingerprint(
         else ["test"],
         FINGERPRINT_CONFIG_NLU_KEY: config_nlu if config_nlu is not None else ["test"],
         FINGERPRINT_DOMAIN_KEY: domain if domain is not None else ["test"],
+        FINGERPRINT_NLG_KEY: nlg if nlg is not None else ["test"],
         FINGERPRINT_TRAINED_AT_KEY: time.time(),
         FINGERPRINT_RASA_VERSION_KEY: rasa_version,
         FINGERPRINT_STORIES_KEY: stories if stories is not None else ["test"],
@@ -138,6 +155,27 @@ def test_nlu_fingerprint_changed(fingerprint2):
     assert nlu_fingerprint_changed(fingerprint1, fingerprint2)
 
 
+def test_nlg_fingerprint_changed():
+    fingerprint1 = _fingerprint()
+
+    assert nlg_fingerprint_changed(fingerprint1, _fingerprint(nlg=["other"]))
+    assert not nlg_fingerprint_changed(fingerprint1, _fingerprint(domain=["other"]))
+    assert not core_fingerprint_changed(fingerprint1, _fingerprint(nlg=["other"]))
+
+
+def test_fingerprint_of_domain_with_changed_templates():
+    domain = Domain.load("examples/moodbot/domain.yml")
+    domain_dict = copy.deepcopy(domain.as_dict())
+    domain_dict["templates"]["utter_greet"] = [{"text": "Hi!"}]
+    changed_domain = Domain.from_dict(domain_dict)
+
+    fingerprint1 = model_fingerprint("examples/moodbot/config.yml", domain)
+    fingerprint2 = model_fingerprint("examples/moodbot/config.yml", changed_domain)
+
+    assert fingerprint1[FINGERPRINT_DOMAIN_KEY] == fingerprint2[FINGERPRINT_DOMAIN_KEY]
+    assert fingerprint1[FINGERPRINT_NLG_KEY] != fingerprint2[FINGERPRINT_NLG_KEY]
+
+
 def _project_files(
     project,
     config_file=DEFAULT_CONFIG_PATH,
@@ -182,7 +220,10 @@ def test_create_fingerprint_from_invalid_paths(project, project_files):
         rasa_version=rasa.__version__,
         stories=[],
         nlu=[],
+        nlg="",
     )
+    expected[FINGERPRINT_STORIES_STATS_KEY] = []
+    expected[FINGERPRINT_NLU_DATA_STATS_KEY] = []
 
     actual = model_fingerprint(**project_files)
     assert actual[FINGERPRINT_TRAINED_AT_KEY] is not None
@@ -193,6 +234,86 @@ def test_create_fingerprint_from_invalid_paths(project, project_files):
     assert actual == expected
 
 
+def test_fingerprint_reuses_hashes_of_unchanged_files(project):
+    project_files = _project_files(project)
+    previous = model_fingerprint(**project_files)
+    previous[FINGERPRINT_NLU_DATA_KEY] = ["reused"]
+    previous[FINGERPRINT_STORIES_KEY] = ["reused"]
+
+    new_nlu_file = os.path.join(project_files["nlu_data"], "new.md")
+    with open(new_nlu_file, "w", encoding="utf-8") as f:
+        f.write("## intent:greet\n- hi\n")
+
+    actual = model_fingerprint(previous=previous, **project_files)
+
+    assert actual[FINGERPRINT_STORIES_KEY] == ["reused"]
+    assert actual[FINGERPRINT_NLU_DATA_KEY] != ["reused"]
+    assert (
+        len(actual[FINGERPRINT_NLU_DATA_KEY])
+        == len(previous[FINGERPRINT_NLU_DATA_STATS_KEY]) + 1
+    )
+
+
+def test_get_hashes_for_paths(tmpdir):
+    from rasa.core.utils import get_file_hash
+    from rasa.model import _get_hashes_for_paths
+
+    for i in range(10):
+        tmpdir.join("{}.md".format(i)).write("file {}".format(i) * i)
+
+    expected = sorted(get_file_hash(f.strpath) for f in tmpdir.listdir())
+
+    assert _get_hashes_for_paths(tmpdir.strpath) == expected
+
+
+def test_fingerprint_from_model(trained_model):
+    fingerprint = _fingerprint()
+    old_model = set_fingerprint(trained_model, fingerprint)
+
+    assert fingerprint_from_model(old_model) == fingerprint
+    assert fingerprint_from_model(None) == {}
+
+
+def test_fingerprint_from_model_without_fingerprint(trained_model):
+    old_model = set_fingerprint(trained_model, _fingerprint(), use_fingerprint=False)
+
+    assert fingerprint_from_model(old_model) == {}
+
+
+def test_failed_packaging_leaves_no_model(trained_model, monkeypatch):
+    def fail(*args):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(rasa.model, "_parallel_gzip_command", lambda: None)
+    monkeypatch.setattr(rasa.model, "_add_directory_to_tar", fail)
+    unpacked_model_path = get_model(trained_model)
+
+    output_directory = tempfile.mkdtemp()
+    with pytest.raises(OSError):
+        create_package_rasa(
+            unpacked_model_path, os.path.join(output_directory, "test.tar.gz")
+        )
+
+    assert os.listdir(output_directory) == []
+
+
+@pytest.mark.parametrize(
+    "gzip_command", [["gzip"], ["gzip", "--unknown-option"], ["unknown-gzip"]]
+)
+def test_rasa_packaging_with_gzip_command(trained_model, monkeypatch, gzip_command):
+    monkeypatch.setattr(
+        rasa.model, "_parallel_gzip_command", lambda: list(gzip_command)
+    )
+    unpacked_model_path = get_model(trained_model)
+
+    output_path = os.path.join(tempfile.mkdtemp(), "test.tar.gz")
+    create_package_rasa(unpacked_model_path, output_path)
+
+    with get_model(output_path) as unpacked:
+        assert os.path.exists(os.path.join(unpacked, "core"))
+        assert os.path.exists(os.path.join(unpacked, "nlu"))
+
+
 @pytest.mark.parametrize("use_fingerprint", [True, False])
 def test_rasa_packaging(trained_model, project, use_fingerprint):
     unpacked_model_path = get_model(trained_model)
@@ -271,6 +392,49 @@ def test_should_retrain(trained_model, fingerprint):
     assert retrain_nlu == fingerprint["retrain_nlu"]
 
 
+def test_should_retrain_with_changed_templates(trained_model):
+    old_model = set_fingerprint(trained_model, _fingerprint())
+    train_path = tempfile.mkdtemp()
+
+    retrain_core, retrain_nlu = should_retrain(
+        _fingerprint(nlg=["other"]), old_model, train_path
+    )
+
+    assert not retrain_core
+    assert not retrain_nlu
+    assert os.path.exists(os.path.join(train_path, "core"))
+    assert os.path.exists(os.path.join(train_path, "nlu"))
+
+
+def test_should_retrain_with_given_nlg_changed(trained_model):
+    old_model = set_fingerprint(trained_model, _fingerprint())
+    train_path = tempfile.mkdtemp()
+
+    # if it's known that the templates didn't change, the old model is kept
+    retrain_core, retrain_nlu = should_retrain(
+        _fingerprint(nlg=["other"]), old_model, train_path, nlg_changed=False
+    )
+
+    assert not retrain_core
+    assert not retrain_nlu
+    assert not os.path.exists(os.path.join(train_path, "core"))
+
+
+def test_update_model_with_new_domain(trained_model):
+    from rasa.model import update_model_with_new_domain
+
+    domain = Domain.load("examples/moodbot/domain.yml")
+    domain_dict = copy.deepcopy(domain.as_dict())
+    domain_dict["templates"]["utter_greet"] = [{"text": "Hi!"}]
+    changed_domain = Domain.from_dict(domain_dict)
+
+    unpacked = get_model(trained_model)
+    update_model_with_new_domain(changed_domain, unpacked)
+
+    actual = Domain.load(os.path.join(unpacked, "core", DEFAULT_DOMAIN_PATH))
+    assert actual.templates["utter_greet"] == [{"text": "Hi!"}]
+
+
 def set_fingerprint(
     trained_model: Text, fingerprint: Fingerprint, use_fingerprint: bool = True
 ) -> Text:
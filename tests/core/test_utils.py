@@ -1,7 +1,10 @@
 import asyncio
+import json
 import os
+import re
 import pytest
 
+import rasa.nlu.config
 import rasa.utils.io
 from rasa.core import utils
 
@@ -21,6 +24,26 @@ def test_is_int():
     assert not utils.is_int(None)
     assert not utils.is_int(1.2)
     assert not utils.is_int("test")
+    assert not utils.is_int(float("inf"))
+    assert not utils.is_int(float("nan"))
+
+
+def test_lazyproperty():
+    class A(object):
+        calls = 0
+
+        @utils.lazyproperty
+        def value(self):
+            """The value."""
+            A.calls += 1
+            return [A.calls]
+
+    a, b = A(), A()
+
+    assert a.value is a.value
+    assert b.value == [2]
+    assert A.calls == 2
+    assert A.value.__doc__ == "The value."
 
 
 def test_subsample_array_read_only():
@@ -33,11 +56,22 @@ def test_subsample_array_read_only():
 
 def test_subsample_array():
     t = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-    # this will modify the original array and shuffle it
+    # the original array is neither modified nor shuffled
     r = utils.subsample_array(t, 5)
 
     assert len(r) == 5
     assert set(r).issubset(t)
+    assert t == [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+
+
+def test_subsample_array_with_fewer_values():
+    t = [3, 1, 2]
+    r = utils.subsample_array(t, 5)
+
+    # all values are returned in their original order in a new list
+    assert r == [3, 1, 2]
+    assert r is not t
+    assert t == [3, 1, 2]
 
 
 def test_on_hot():
@@ -63,6 +97,36 @@ def test_cap_length_with_short_string():
     assert utils.cap_length("my", 3) == "my"
 
 
+def test_extract_args():
+    kwargs = {"a": 1, "b": 2, "c": 3}
+
+    extracted, remaining = utils.extract_args(kwargs, {"a", "c", "d"})
+
+    assert extracted == {"a": 1, "c": 3}
+    assert remaining == {"b": 2}
+    assert kwargs == {"a": 1, "b": 2, "c": 3}
+
+
+def test_all_subclasses():
+    class A(object):
+        pass
+
+    class B(A):
+        pass
+
+    class C(A):
+        pass
+
+    class D(B, C):
+        pass
+
+    class E(D):
+        pass
+
+    assert utils.all_subclasses(A) == [B, C, D, E]
+    assert utils.all_subclasses(E) == []
+
+
 def test_pad_list_to_size():
     assert utils.pad_list_to_size(["e1", "e2"], 4, "other") == [
         "e1",
@@ -82,6 +146,154 @@ def test_read_lines():
     assert len(lines) == 2
 
 
+def test_read_lines_with_default_pattern():
+    filename = "data/test_stories/stories.md"
+    lines = list(utils.read_lines(filename, max_line_limit=5))
+
+    with open(filename, "r", encoding="utf-8") as f:
+        expected = [re.match(".*", line).group(0) for line in f][:5]
+
+    assert lines == expected
+
+
+def test_get_file_hash_matches_hash_of_content(tmpdir):
+    content = "some content\n" * 100000
+    f = tmpdir.join("file.txt")
+    f.write(content)
+
+    assert utils.get_file_hash(f.strpath) == utils.get_text_hash(content)
+
+
+def test_dump_obj_as_json_to_file(tmpdir):
+    obj = {"intent": "greet", "text": "grüß dich", "confidence": 0.5, "ents": []}
+    f = tmpdir.join("obj.json").strpath
+    utils.dump_obj_as_json_to_file(f, obj)
+
+    assert rasa.utils.io.read_json_file(f) == obj
+
+
+def test_dump_obj_as_json_to_file_without_orjson(tmpdir, monkeypatch):
+    monkeypatch.setattr(utils, "orjson", None)
+    obj = {"text": "grüß dich", "confidence": float("nan"), "ents": [None]}
+    f = tmpdir.join("obj.json").strpath
+    utils.dump_obj_as_json_to_file(f, obj)
+
+    assert rasa.utils.io.read_file(f) == json.dumps(obj, indent=2)
+
+
+def test_dump_obj_as_json_to_file_keeps_non_finite_floats(tmpdir, monkeypatch):
+    from types import SimpleNamespace
+
+    # `orjson` writes non finite floats as `null`
+    fake_orjson = SimpleNamespace(
+        OPT_INDENT_2=1, dumps=lambda obj, option=0: b'{\n  "confidence": null\n}'
+    )
+    monkeypatch.setattr(utils, "orjson", fake_orjson)
+    obj = {"confidence": float("inf")}
+    f = tmpdir.join("obj.json").strpath
+    utils.dump_obj_as_json_to_file(f, obj)
+
+    assert rasa.utils.io.read_json_file(f) == obj
+
+
+def test_dump_obj_as_json_to_file_with_orjson(tmpdir, monkeypatch):
+    from types import SimpleNamespace
+
+    fake_orjson = SimpleNamespace(
+        OPT_INDENT_2=1, dumps=lambda obj, option=0: b'{\n  "confidence": 0.5\n}'
+    )
+    monkeypatch.setattr(utils, "orjson", fake_orjson)
+    f = tmpdir.join("obj.json").strpath
+    utils.dump_obj_as_json_to_file(f, {"confidence": 0.5})
+
+    assert rasa.utils.io.read_file(f) == '{\n  "confidence": 0.5\n}'
+
+
+def test_get_dict_hash_is_independent_of_key_order():
+    assert utils.get_dict_hash({"a": 1, "b": [1, 2]}) == utils.get_dict_hash(
+        {"b": [1, 2], "a": 1}
+    )
+
+
+def test_get_dict_hash_does_not_depend_on_orjson(monkeypatch):
+    from types import SimpleNamespace
+
+    data = {"ä": [1e-07, 1e20, float("nan")], "b": {"ü": 0.1, "c": 1}}
+
+    monkeypatch.setattr(utils, "orjson", None)
+    without_orjson = utils.get_dict_hash(data)
+
+    # `orjson` writes e.g. `1e-7` instead of `1e-07`
+    fake_orjson = SimpleNamespace(OPT_INDENT_2=1, dumps=lambda obj, option=0: b"{}")
+    monkeypatch.setattr(utils, "orjson", fake_orjson)
+
+    assert utils.get_dict_hash(data) == without_orjson
+    assert utils._canonical_json(data).encode("utf-8") == (
+        '{"b":{"c":1,"ü":0.1},"ä":[1e-07,1e+20,NaN]}'.encode("utf-8")
+    )
+
+
+def test_hashable_ndarray():
+    import numpy as np
+
+    a = utils.HashableNDArray(np.array([[1, 2], [3, 4]]))
+    b = utils.HashableNDArray(np.array([[1, 2], [3, 4]]).T.T, tight=True)
+    c = utils.HashableNDArray(np.array([[1, 3], [2, 4]]).T)
+
+    assert hash(a) == hash(b) == hash(c)
+    assert a == b == c
+    assert len({a, b, c}) == 1
+
+
+def test_hashable_ndarray_without_xxhash(monkeypatch):
+    import numpy as np
+
+    monkeypatch.setattr(utils, "xxh3_64_intdigest", None)
+    a = utils.HashableNDArray(np.array([[1, 2], [3, 4]]))
+    b = utils.HashableNDArray(np.array([[1, 3], [2, 4]]).T)
+
+    assert hash(a) == hash(b)
+    assert a == b
+
+
+async def test_download_file_from_url():
+    from aioresponses import aioresponses
+
+    content = b"* greet\n    - utter_greet\n" * 10000
+    with aioresponses() as mocked:
+        mocked.get("https://example.com/stories.md", body=content)
+        filename = await utils.download_file_from_url("https://example.com/stories.md")
+
+    with open(filename, "rb") as f:
+        assert f.read() == content
+    os.remove(filename)
+
+
+async def test_failed_download_leaves_no_file(tmpdir, monkeypatch):
+    import aiohttp
+    import tempfile
+    from aioresponses import aioresponses
+
+    class LostConnection(object):
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            raise aiohttp.ClientPayloadError("Connection lost")
+
+    monkeypatch.setattr(tempfile, "tempdir", tmpdir.strpath)
+    monkeypatch.setattr(
+        aiohttp.StreamReader, "iter_chunked", lambda self, n: LostConnection()
+    )
+
+    with aioresponses() as mocked:
+        mocked.get("https://example.com/stories.md", body=b"* greet")
+        with pytest.raises(aiohttp.ClientPayloadError):
+            await utils.download_file_from_url("https://example.com/stories.md")
+
+    assert tmpdir.listdir() == []
+
+
 os.environ["USER_NAME"] = "user"
 os.environ["PASS"] = "pass"
 
@@ -149,6 +361,93 @@ def test_read_yaml_string_with_env_var_not_exist():
         rasa.utils.io.read_yaml(config_with_env_var_not_exist)
 
 
+def test_read_file_with_cache(tmpdir):
+    f = tmpdir.join("config.yml")
+    f.write("a: 1")
+    loaded = []
+
+    def loader(filename):
+        loaded.append(filename)
+        return rasa.utils.io.read_config_file(filename)
+
+    assert rasa.utils.io.read_file_with_cache(f.strpath, loader) == {"a": 1}
+    assert rasa.utils.io.read_file_with_cache(f.strpath, loader) == {"a": 1}
+    assert len(loaded) == 1
+
+    f.write("a: 10")
+    assert rasa.utils.io.read_file_with_cache(f.strpath, loader) == {"a": 10}
+    assert len(loaded) == 2
+
+    rasa.utils.io.clear_file_cache()
+    assert rasa.utils.io.read_file_with_cache(f.strpath, loader) == {"a": 10}
+    assert len(loaded) == 3
+
+
+def test_read_file_with_cache_missing_file(tmpdir):
+    missing = tmpdir.join("nope.yml").strpath
+
+    with pytest.raises(ValueError) as execinfo:
+        rasa.utils.io.read_file_with_cache(missing, rasa.utils.io.read_config_file)
+    assert "does not exist" in str(execinfo.value)
+
+    with pytest.raises(ValueError) as execinfo:
+        rasa.nlu.config.load(missing)
+    assert "does not exist" in str(execinfo.value)
+
+
+def test_read_file_with_cache_evicts_least_recently_used(tmpdir, monkeypatch):
+    monkeypatch.setattr(rasa.utils.io, "FILE_CACHE_SIZE", 2)
+    rasa.utils.io.clear_file_cache()
+    loaded = []
+
+    def loader(filename):
+        loaded.append(os.path.basename(filename))
+        return rasa.utils.io.read_file(filename)
+
+    files = []
+    for name in ["a.txt", "b.txt", "c.txt"]:
+        f = tmpdir.join(name)
+        f.write(name)
+        files.append(f.strpath)
+
+    rasa.utils.io.read_file_with_cache(files[0], loader)
+    rasa.utils.io.read_file_with_cache(files[1], loader)
+    # `a.txt` is used again, hence `b.txt` is evicted when `c.txt` is loaded
+    rasa.utils.io.read_file_with_cache(files[0], loader)
+    rasa.utils.io.read_file_with_cache(files[2], loader)
+    assert loaded == ["a.txt", "b.txt", "c.txt"]
+
+    rasa.utils.io.read_file_with_cache(files[0], loader)
+    rasa.utils.io.read_file_with_cache(files[1], loader)
+    assert loaded == ["a.txt", "b.txt", "c.txt", "b.txt"]
+
+    rasa.utils.io.clear_file_cache()
+
+
+def test_read_file_with_cache_from_multiple_threads(tmpdir, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(rasa.utils.io, "FILE_CACHE_SIZE", 2)
+    files = []
+    for i in range(5):
+        f = tmpdir.join("{}.txt".format(i))
+        f.write(str(i))
+        files.append(f.strpath)
+
+    def read(i):
+        if i % 10 == 0:
+            rasa.utils.io.clear_file_cache()
+        filename = files[i % len(files)]
+        return rasa.utils.io.read_file_with_cache(filename, rasa.utils.io.read_file)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(read, range(500)))
+
+    assert results == [str(i % len(files)) for i in range(500)]
+
+    rasa.utils.io.clear_file_cache()
+
+
 @pytest.mark.parametrize("file, parents", [("A/test.md", "A"), ("A", "A")])
 def test_file_in_path(file, parents):
     assert rasa.utils.io.is_subdirectory(file, parents)
@@ -74,3 +74,26 @@ def test_override_defaults_supervised_embeddings_pipeline():
     component2_cfg = cfg.for_component(1)
     component2 = builder.create_component(component2_cfg, cfg)
     assert component2.epochs == 10
+
+
+def test_override_defaults_does_not_share_mutable_values():
+    defaults = {"name": "A", "sizes": [1, 2], "nested": {"a": [1]}, "other": [3]}
+    custom = {"other": [4]}
+
+    cfg = config.override_defaults(defaults, custom)
+    cfg["sizes"].append(3)
+    cfg["nested"]["a"].append(2)
+
+    assert cfg == {
+        "name": "A",
+        "sizes": [1, 2, 3],
+        "nested": {"a": [1, 2]},
+        "other": [4],
+    }
+    assert defaults == {
+        "name": "A",
+        "sizes": [1, 2],
+        "nested": {"a": [1]},
+        "other": [3],
+    }
+    assert list(cfg.keys()) == list(defaults.keys())
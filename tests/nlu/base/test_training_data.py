@@ -539,3 +539,21 @@ def test_guess_format_from_non_existing_file_path():
 def test_load_data_from_non_existing_file():
     with pytest.raises(ValueError):
         load_data("some path")
+
+
+@pytest.mark.parametrize(
+    "filename", ["data/examples/rasa/demo-rasa.json", "data/examples/rasa/demo-rasa.md"]
+)
+def test_load_data_reads_file_once(filename, monkeypatch):
+    read_files = []
+    read_file = io_utils.read_file
+
+    def counting_read_file(*args, **kwargs):
+        read_files.append(args[0])
+        return read_file(*args, **kwargs)
+
+    monkeypatch.setattr(io_utils, "read_file", counting_read_file)
+    td = load_data(filename)
+
+    assert read_files == [filename]
+    assert td.training_examples
@@ -1,12 +1,25 @@
+import asyncio
+import logging
 import tempfile
 import os
 import shutil
+import sys
 
 import pytest
 
 from rasa.model import unpack_model
 
-from rasa.train import _package_model, train
+import rasa.model
+from rasa.constants import ENV_TRAIN_IN_SEPARATE_PROCESSES
+from rasa.train import (
+    _get_latest_model_and_fingerprint,
+    _is_empty,
+    _package_model,
+    _train_in_process,
+    _training_processes,
+    train,
+    train_nlu_async,
+)
 from tests.core.test_model import _fingerprint
 
 TEST_TEMP = "test_tmp"
@@ -45,6 +58,118 @@ def test_package_model(trained_rasa_model, parameters):
     assert file_name.endswith(".tar.gz")
 
 
+def test_is_empty(tmpdir):
+    assert _is_empty(tmpdir.strpath)
+
+    tmpdir.join("nlu.md").write("## intent:greet")
+
+    assert not _is_empty(tmpdir.strpath)
+
+
+def test_get_latest_model_and_fingerprint(trained_rasa_model, tmpdir, monkeypatch):
+    loaded_fingerprints = []
+    fingerprint_from_model = rasa.model.fingerprint_from_model
+
+    def counting_fingerprint_from_model(model_file):
+        loaded_fingerprints.append(model_file)
+        return fingerprint_from_model(model_file)
+
+    monkeypatch.setattr(
+        rasa.model, "fingerprint_from_model", counting_fingerprint_from_model
+    )
+
+    old_model = tmpdir.join("old.tar.gz").strpath
+    shutil.copy(trained_rasa_model, old_model)
+
+    assert _get_latest_model_and_fingerprint(tmpdir.strpath) == (
+        old_model,
+        fingerprint_from_model(trained_rasa_model),
+    )
+    assert _get_latest_model_and_fingerprint(tmpdir.strpath)[0] == old_model
+    assert len(loaded_fingerprints) == 1
+
+    new_model = tmpdir.join("new.tar.gz").strpath
+    shutil.copy(trained_rasa_model, new_model)
+
+    assert _get_latest_model_and_fingerprint(tmpdir.strpath)[0] == new_model
+    assert len(loaded_fingerprints) == 2
+
+    assert _get_latest_model_and_fingerprint(tmpdir.mkdir("empty").strpath) == (
+        None,
+        {},
+    )
+
+
+def test_training_processes_disabled_by_default(monkeypatch):
+    monkeypatch.delenv(ENV_TRAIN_IN_SEPARATE_PROCESSES, raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    assert _training_processes() is None
+
+
+def test_training_processes_with_one_cpu(monkeypatch):
+    monkeypatch.setenv(ENV_TRAIN_IN_SEPARATE_PROCESSES, "true")
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+
+    assert _training_processes() is None
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="requires Python 3.7")
+def test_train_in_process(tmpdir, monkeypatch):
+    monkeypatch.setenv(ENV_TRAIN_IN_SEPARATE_PROCESSES, "true")
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    with _training_processes() as processes:
+        is_empty = processes.submit(
+            _train_in_process, _is_empty, logging.INFO, directory=tmpdir.strpath
+        )
+        # coroutines are run in an event loop of the process
+        sleep = processes.submit(
+            _train_in_process, asyncio.sleep, logging.INFO, delay=0, result="done"
+        )
+
+        assert is_empty.result()
+        assert sleep.result() == "done"
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="requires Python 3.7")
+def test_train_in_separate_processes(
+    tmpdir,
+    monkeypatch,
+    default_domain_path,
+    default_stories_file,
+    default_stack_config,
+    default_nlu_data,
+):
+    monkeypatch.setenv(ENV_TRAIN_IN_SEPARATE_PROCESSES, "true")
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    used_processes = []
+
+    def training_processes():
+        processes = _training_processes()
+        used_processes.append(processes)
+        return processes
+
+    # `rasa.train` is shadowed by the `train` function exported by `rasa`
+    train_module = sys.modules["rasa.train"]
+    monkeypatch.setattr(train_module, "_training_processes", training_processes)
+
+    model_path = train(
+        default_domain_path,
+        default_stack_config,
+        [default_stories_file, default_nlu_data],
+        output=tmpdir.strpath,
+    )
+
+    assert len(used_processes) == 1
+    assert used_processes[0] is not None
+
+    unpacked = unpack_model(model_path)
+    assert os.path.exists(os.path.join(unpacked, "core"))
+    assert os.path.exists(os.path.join(unpacked, "nlu"))
+
+
 @pytest.fixture
 def move_tempdir():
     # Create a new *empty* tmp directory
@@ -82,3 +207,21 @@ def test_train_temp_files(
     )
 
     assert len(os.listdir(TEST_TEMP)) == 0
+
+
+async def test_train_nlu_async(tmpdir, default_stack_config, default_nlu_data):
+    model_path = await train_nlu_async(
+        default_stack_config, default_nlu_data, output=tmpdir.strpath
+    )
+
+    assert os.path.dirname(model_path) == tmpdir.strpath
+    assert os.path.basename(model_path).startswith("nlu-")
+
+
+def test_train_without_domain_temp_files(
+    move_tempdir, tmpdir, default_stack_config, default_nlu_data
+):
+    model_path = train(None, default_stack_config, [default_nlu_data], tmpdir.strpath)
+
+    assert os.path.basename(model_path).startswith("nlu-")
+    assert len(os.listdir(TEST_TEMP)) == 0
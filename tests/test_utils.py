@@ -7,7 +7,7 @@ from prompt_toolkit.validation import ValidationError
 
 from rasa.constants import DOMAIN_SCHEMA_FILE, CONFIG_SCHEMA_FILE
 from rasa.utils.validation import validate_yaml_schema, InvalidYamlFileError
-from rasa.utils.endpoints import EndpointConfig, concat_url
+from rasa.utils.endpoints import EndpointConfig, concat_url, read_endpoint_configs
 from tests.utilities import latest_request, json_of_latest_request
 from rasa.utils.common import sort_list_of_dicts_by_first_key
 import rasa.utils.io
@@ -122,6 +122,21 @@ def test_warning_for_base_paths_with_trailing_slash(caplog):
     assert len(caplog.records) == 1
 
 
+def test_read_endpoint_configs():
+    configs = read_endpoint_configs(
+        "data/test_endpoints/example_endpoints.yml",
+        ["nlg", "tracker_store", "action_endpoint"],
+    )
+
+    assert configs["nlg"].url == "http://localhost:5055/nlg"
+    assert configs["tracker_store"].type == "redis"
+    assert configs["action_endpoint"] is None
+
+
+def test_read_endpoint_configs_without_file():
+    assert read_endpoint_configs(None, ["nlg"]) == {"nlg": None}
+
+
 def test_read_file_with_not_existing_path():
     with pytest.raises(ValueError):
         rasa.utils.io.read_file("some path")